@@ -0,0 +1,4 @@
+# TicTacToe engine: boards, the negamax search and the move conversion helpers.
+# Importing the package has no side effects. The interactive program is started with python3 -m tictactoe (or python3 ttt.py).
+from .board import TicTacToeBoard, BitboardTicTacToeBoard, BOARD_BACKENDS, new_board, player_to_int, int_to_player, move_to_string, string_to_move
+from .search import TranspositionTable, negamax, get_legal_move_outcomes, get_search_nodes, reset_search_nodes
@@ -0,0 +1,5 @@
+# Entry point of the TTT program: python3 -m tictactoe [--backend array/bitboard] [--build-solutions]
+from .cli import main
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,86 @@
+# Batch evaluation of many positions at once with NumPy: terminal status, legal moves and solved values.
+# Positions are given as a 2-D array with one row per position and one column per point (0 empty, 1 x, 2 o).
+from collections import namedtuple
+import numpy as np
+from .board import win_lines, zobrist_table
+from .solutions import get_solution_table
+
+# Terminal status of a position: game still going on, x won, o won or draw
+ONGOING, X_WON, O_WON, DRAW = 0, 1, 2, 3
+
+# Result of evaluate_positions (arrays with one entry per position):
+#   status  - ONGOING, X_WON, O_WON or DRAW
+#   legal   - boolean mask of the legal moves (empty points; none once the game is over)
+#   players - player to move (1 for x, 2 for o)
+#   values  - minimax value for the player to move (1 win, 0 draw, -1 loss), 0 where solved is False
+#   solved  - True where the value is known: terminal positions and positions found in the solution table
+BatchEvaluation = namedtuple('BatchEvaluation', ['status', 'legal', 'players', 'values', 'solved'])
+
+# NumPy versions of the board geometry tables, cached per geometry
+Line_arrays = {}
+Zobrist_arrays = {}
+
+
+# Return the win lines of a geometry as an array with one row of k points per line
+def line_array(geometry):
+	if geometry not in Line_arrays:
+		lines = win_lines(*geometry)[0]
+		Line_arrays[geometry] = np.array(lines, dtype=np.intp).reshape(len(lines), geometry[2])
+	return Line_arrays[geometry]
+
+
+# Return the Zobrist keys of a geometry as an array of shape (symmetries, points, 3): the key that a stone of a player
+# at a point adds to the key of every symmetric image of the position
+def zobrist_array(geometry):
+	if geometry not in Zobrist_arrays:
+		table = zobrist_table(geometry)
+		Zobrist_arrays[geometry] = np.array(table, dtype=np.uint64).transpose(2, 0, 1).copy()
+	return Zobrist_arrays[geometry]
+
+
+# Return the canonical Zobrist key of every position (the smallest key among all its rotations and reflections),
+# the same key as TicTacToeBoard.canonical()
+def canonical_keys(positions, geometry):
+	zobrist = zobrist_array(geometry)
+	points = np.arange(positions.shape[1])
+	keys = [np.bitwise_xor.reduce(zobrist[symmetry][points, positions], axis=1) for symmetry in range(len(zobrist))]
+	return np.min(keys, axis=0)
+
+
+# Evaluate a batch of positions of a board geometry (rows, cols, k). players gives the player to move for every position
+# (or one player for all of them); by default x moves when both players have the same number of stones and o moves otherwise.
+# Win detection gathers the points of every win line at once and the values come from the solution table of the geometry,
+# if it has been built. Return a BatchEvaluation.
+def evaluate_positions(positions, geometry=(3, 3, 3), players=None):
+	rows, cols, k = geometry
+	positions = np.asarray(positions, dtype=np.intp).reshape(-1, rows*cols)
+	count = len(positions)
+	if players is None:
+		x_stones = np.count_nonzero(positions == 1, axis=1)
+		o_stones = np.count_nonzero(positions == 2, axis=1)
+		players = np.where(x_stones > o_stones, 2, 1)
+	players = np.broadcast_to(np.asarray(players, dtype=np.int8), (count,))
+
+	# Terminal status: gather the stones on every win line (positions x lines x k)
+	on_lines = positions[:, line_array(geometry)]
+	x_won = np.all(on_lines == 1, axis=2).any(axis=1)
+	o_won = np.all(on_lines == 2, axis=2).any(axis=1)
+	empty = positions == 0
+	full = ~empty.any(axis=1)
+	status = np.select([x_won, o_won, full], [X_WON, O_WON, DRAW], ONGOING).astype(np.int8)
+	legal = empty & (status == ONGOING)[:, None]
+
+	# Values: terminal positions from their status (a draw is 0), the other positions from the solution table
+	values = np.zeros(count, dtype=np.int8)
+	solved = status != ONGOING
+	player_won = np.where(players == 1, x_won, o_won)
+	opponent_won = np.where(players == 1, o_won, x_won)
+	values[opponent_won] = -1
+	values[player_won] = 1
+	table = get_solution_table(geometry)
+	ongoing = np.flatnonzero(status == ONGOING)
+	if table is not None and len(ongoing) > 0:
+		table_values, found = table.lookup_keys(canonical_keys(positions[ongoing], geometry), players[ongoing])
+		values[ongoing[found]] = table_values[found]
+		solved[ongoing[found]] = True
+	return BatchEvaluation(status, legal, np.array(players), values, solved)
@@ -0,0 +1,243 @@
+# Benchmark suite: board operation microbenchmarks, negamax solves and the latency of TTT commands.
+# Results are saved as JSON, {"meta": {...}, "results": {name: {"seconds": s, "nodes": n}}}, and can be compared against a
+# stored baseline to catch performance regressions. Times are the fastest of several repeats, node counts are exact.
+# Every benchmark runs for each board backend and the solves for each transposition table policy.
+import json
+import os
+import platform
+import sys
+import time
+from . import cli, search
+from .board import BOARD_BACKENDS, new_board, string_to_move
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Benchmarks')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+# A benchmark regresses when it is this much slower than the baseline (0.25 = 25% slower)
+DEFAULT_TOLERANCE = 0.25
+
+# Positions are (geometry, moves) with the moves played alternately by x and o, x first
+# Position of the board microbenchmarks
+BOARD_POSITION = ((3, 3, 3), 'b2 a1 c3 a3')
+# Positions solved with negamax: the empty board at several sizes and a fixed set of midgame positions
+SOLVE_POSITIONS = [
+	((3, 3, 3), ''),
+	((3, 4, 3), ''),
+	((4, 4, 3), ''),
+	((3, 3, 3), 'a1 b2'),
+	((4, 4, 4), 'b2 c3 b3 b1'),
+	((4, 4, 4), 'a1 b2 d4 c3 b3 c2'),
+	((5, 5, 4), 'c3 b2 c2 c4 b4 d2 a5 d3 e1 c1 a3 b3'),
+	((4, 4, 4), ''),
+	((5, 5, 4), 'c3 c2 b3 d4 d3 b2 e3 a3 c4 a1'),
+]
+# Quick runs (--quick) skip the slow solves at the end of SOLVE_POSITIONS
+QUICK_SOLVES = 7
+# Commands timed through cli.cmds(): (name, command, position). The moves the commands play can not win the game.
+COMMANDS = [
+	('gen', 'gen x', ((3, 3, 3), '')),
+	('gen', 'gen x', ((3, 3, 3), 'b2 a1')),
+	('gen_nodes', 'gen o nodes 2000', ((4, 4, 4), 'b2')),
+	('genr', 'genr x', ((3, 3, 3), 'b2 a1')),
+	('t', 't', ((3, 3, 3), 'b2')),
+	('result', 'result', ((3, 3, 3), 'b2 a1 c3 a3')),
+]
+# Transposition table policies the solves are run with
+TT_POLICIES = ('depth', 'two-tier')
+
+
+# Return a board of the backend set up at position (geometry, moves) and the player to move
+def setup_board(backend, position, board=None):
+	(rows, cols, k), moves = position
+	if board is None or board.geometry != (rows, cols, k): board = new_board(cols, rows, k, backend)
+	else: board.reset()
+	player = board.x_player
+	for move in moves.split():
+		row, col = string_to_move(move, board)
+		board.play_move(player, board.get_pt(row, col))
+		player = board.x_player + board.o_player - player
+	return board, player
+
+
+# Name of a position in benchmark names: 3x3k3/empty or 4x4k4/b2-c3-b3-b1
+def position_name(position):
+	(rows, cols, k), moves = position
+	return "{}x{}k{}/{}".format(rows, cols, k, '-'.join(moves.split()) or 'empty')
+
+
+# Return the fastest time of repeats runs of function, after calling setup before each run. Setup time is not counted.
+def best_time(function, repeats, setup=None):
+	best = None
+	for repeat in range(repeats):
+		if setup is not None: setup()
+		start = time.perf_counter()
+		function()
+		elapsed = time.perf_counter() - start
+		if best is None or elapsed < best: best = elapsed
+	return best
+
+
+# Microbenchmarks of the board operations. Times are per call.
+def bench_board(backend, repeats, number=2000):
+	board, player = setup_board(backend, BOARD_POSITION)
+	pts = [int(pt) for pt in board.gen_legal_moves()]
+	def play_undo():
+		for i in range(number):
+			for pt in pts: board.play_move(player, pt)
+			for pt in pts: board.undo_move(pt)
+	def is_winner():
+		for i in range(number): board.is_winner(player)
+	def wins_at():
+		for i in range(number):
+			for pt in pts: board.wins_at(pt)
+	def gen_legal_moves():
+		for i in range(number): board.gen_legal_moves()
+	return {
+		'play_undo': {'seconds': best_time(play_undo, repeats) / (number * len(pts))},
+		'is_winner': {'seconds': best_time(is_winner, repeats) / number},
+		'wins_at': {'seconds': best_time(wins_at, repeats) / (number * len(pts))},
+		'gen_legal_moves': {'seconds': best_time(gen_legal_moves, repeats) / number},
+	}
+
+
+# Solve a position with negamax from an empty transposition table of the policy. Return the time and the number of nodes.
+def bench_solve(backend, policy, position, repeats):
+	board, player = setup_board(backend, position)
+	saved_table = search.Transposition_table
+	search.Transposition_table = search.TranspositionTable(policy=policy)
+	try:
+		def setup():
+			search.Transposition_table.clear()
+			search.Killer_moves.clear()
+			search.reset_search_nodes()
+		seconds = best_time(lambda: search.negamax(board, player), repeats, setup)
+		nodes = search.get_search_nodes()
+	finally:
+		search.Transposition_table = saved_table
+	return {'seconds': seconds, 'nodes': nodes}
+
+
+# Time cli.cmds(command) on the position, with a cleared transposition table and the output of the command discarded
+def bench_command(backend, command, position, repeats):
+	board = setup_board(backend, position)[0]
+	def setup():
+		setup_board(backend, position, board)
+		search.Transposition_table.clear()
+		search.Exact_outcomes.clear()
+		search.Killer_moves.clear()
+	with discarded_output():
+		seconds = best_time(lambda: cli.cmds(command, board), repeats, setup)
+	return {'seconds': seconds}
+
+
+# Context manager that sends everything written to the standard output (print and sys.stdout.write) to os.devnull
+class discarded_output:
+	def __enter__(self):
+		sys.stdout.flush()
+		self.saved_fd = os.dup(1)
+		devnull = os.open(os.devnull, os.O_WRONLY)
+		os.dup2(devnull, 1)
+		os.close(devnull)
+
+	def __exit__(self, *exc_info):
+		sys.stdout.flush()
+		os.dup2(self.saved_fd, 1)
+		os.close(self.saved_fd)
+
+
+# Run the benchmarks for the backends. Return the results as {name: {"seconds": s, "nodes": n}}.
+def run_benchmarks(backends=None, repeats=5, quick=False):
+	results = {}
+	solves = SOLVE_POSITIONS[:QUICK_SOLVES] if quick else SOLVE_POSITIONS
+	for backend in backends or list(BOARD_BACKENDS):
+		for name, result in bench_board(backend, repeats).items():
+			results['board/{}/{}'.format(backend, name)] = result
+		for policy in TT_POLICIES:
+			for position in solves:
+				results['solve/{}/{}/{}'.format(backend, policy, position_name(position))] = bench_solve(backend, policy, position, repeats)
+		for name, command, position in COMMANDS:
+			results['cmds/{}/{}/{}'.format(backend, name, position_name(position))] = bench_command(backend, command, position, repeats)
+	return results
+
+
+# Return the information about the machine and the program that the results depend on
+def bench_meta():
+	from .solutions import get_solution_table
+	return {
+		'python': platform.python_version(),
+		'implementation': platform.python_implementation(),
+		'machine': platform.machine(),
+		'system': platform.system(),
+		'solution_table': get_solution_table((3, 3, 3)) is not None,
+		'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+	}
+
+
+# Compare results against baseline results. Return a list of (name, baseline seconds, seconds, ratio, status) where status is
+# 'slower' past the tolerance, 'faster' past it, 'nodes' if the number of nodes searched changed, 'new' or 'missing', else 'ok'.
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+	rows = []
+	for name in sorted(set(results) | set(baseline)):
+		if name not in baseline: rows.append((name, None, results[name]['seconds'], None, 'new'))
+		elif name not in results: rows.append((name, baseline[name]['seconds'], None, None, 'missing'))
+		else:
+			old, new = baseline[name], results[name]
+			ratio = new['seconds'] / old['seconds'] if old['seconds'] else 1.0
+			if old.get('nodes') != new.get('nodes'): status = 'nodes'
+			elif ratio > 1 + tolerance: status = 'slower'
+			elif ratio < 1 / (1 + tolerance): status = 'faster'
+			else: status = 'ok'
+			rows.append((name, old['seconds'], new['seconds'], ratio, status))
+	return rows
+
+
+# Format seconds for the tables, None as '-'
+def format_seconds(seconds):
+	if seconds is None: return '-'
+	for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+		if seconds >= scale: return "{:.3f} {}".format(seconds / scale, unit)
+	return "{:.1f} ns".format(seconds / 1e-9)
+
+
+# Table of the results, with the node counts of the solves
+def results_table(results):
+	lines = ["{:<68}{:>14}{:>10}".format("benchmark", "time", "nodes")]
+	for name, result in sorted(results.items()):
+		lines.append("{:<68}{:>14}{:>10}".format(name, format_seconds(result['seconds']), result.get('nodes', '')))
+	return "\n".join(lines)
+
+
+# Table of a comparison against the baseline
+def comparison_table(rows):
+	lines = ["{:<68}{:>14}{:>14}{:>8}  {}".format("benchmark", "baseline", "time", "ratio", "status")]
+	for name, old, new, ratio, status in rows:
+		lines.append("{:<68}{:>14}{:>14}{:>8}  {}".format(name, format_seconds(old), format_seconds(new), '-' if ratio is None else "{:.2f}".format(ratio), status))
+	return "\n".join(lines)
+
+
+# Command line: python3 -m tictactoe.bench [--backend NAME] [--repeats N] [--quick] [--output FILE]
+#                                          [--baseline FILE] [--save-baseline] [--tolerance T]
+# The exit status is 1 if a benchmark is slower than the baseline or searched a different number of nodes.
+if __name__ == '__main__':
+	import argparse
+	parser = argparse.ArgumentParser(description="Benchmark the board backends, the search and the TTT commands")
+	parser.add_argument('--backend', choices=list(BOARD_BACKENDS), action='append', help="backend to benchmark (default: all)")
+	parser.add_argument('--repeats', type=int, default=5, help="repeats per benchmark, the fastest counts")
+	parser.add_argument('--quick', action='store_true', help="skip the slow solves")
+	parser.add_argument('--output', default=None, help="save the results to this JSON file")
+	parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON file to compare against")
+	parser.add_argument('--save-baseline', action='store_true', help="save the results as the baseline")
+	parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown against the baseline")
+	args = parser.parse_args()
+
+	report = {'meta': bench_meta(), 'results': run_benchmarks(args.backend, args.repeats, args.quick)}
+	print(results_table(report['results']))
+	outputs = ([args.output] if args.output else []) + ([args.baseline] if args.save_baseline else [])
+	for output in outputs:
+		if os.path.dirname(output): os.makedirs(os.path.dirname(output), exist_ok=True)
+		with open(output, 'w') as f: json.dump(report, f, indent=1, sort_keys=True)
+	if not args.save_baseline and os.path.exists(args.baseline):
+		with open(args.baseline) as f: baseline = json.load(f)
+		rows = compare_results(report['results'], baseline['results'], args.tolerance)
+		print("\nCompared against " + args.baseline)
+		print(comparison_table(rows))
+		if any(status in ('slower', 'nodes') for name, old, new, ratio, status in rows): sys.exit(1)
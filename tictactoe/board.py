@@ -0,0 +1,334 @@
+# TicTacToe boards: the board classes, board geometry tables (win lines, symmetries, Zobrist keys) and move conversion helpers.
+import random
+
+# Cached win lines, win line masks and symmetries per board geometry
+Win_lines = {}
+Win_line_masks = {}
+Symmetries = {}
+# Largest number of rows/columns a board can have (columns are lettered a...z without i)
+MAX_BOARD_SIZE = 25
+COLUMN_LETTERS = "abcdefghjklmnopqrstuvwxyz"
+# Zobrist hashing: random 64 bit keys for every (point, player) pair, cached per board geometry.
+# A fixed seed keeps the keys (and anything keyed by them) the same from one run to the next.
+ZOBRIST_SEED = 355
+Zobrist_tables = {}
+# Zobrist keys for the player to move, used to tell apart the same position with different players to move
+Zobrist_player = (0, 0x6a09e667f3bcc908, 0xbb67ae8584caa73b)
+# Legal moves of the empty masks seen so far: empty mask -> tuple of its points in increasing order. All boards share the
+# tuples, so generating the legal moves of a known position allocates nothing. The cache is bounded by memory, not by the
+# number of masks: it is cleared when its tuples hold LEGAL_MOVES_CACHE_POINTS points in all (a few tens of MB), however big the board.
+Legal_moves = {}
+LEGAL_MOVES_CACHE_POINTS = 1 << 20
+Legal_moves_points = 0
+
+
+# TicTacToeBoard Class represents the board for the TTT program.
+# The board has rows x cols points (size x size by default) and a player wins with k stones in a row (size in a row by default).
+class TicTacToeBoard:
+	def __init__(self, size, rows=None, k=None):
+		self.empty = 0
+		self.x_player = 1
+		self.o_player = 2
+		self.set_geometry(size if rows is None else rows, size, size if k is None else k)
+
+	# Change the shape of the board (rows x cols, k in a row to win) and clear it.
+	def set_geometry(self, rows, cols, k):
+		self.rows = rows
+		self.cols = cols
+		self.win_length = k
+		# The board size is the width of a row, the array index of a point is col + board_size*row
+		self.board_size = cols
+		self.geometry = (rows, cols, k)
+		self.win_lines, self.lines_through = win_lines(rows, cols, k)
+		self.symmetries, self.inverse_symmetries = symmetries(rows, cols)
+		self.zobrist = zobrist_table(self.geometry)
+		self.clear()
+
+	# Remove all stones from the board
+	def clear(self):
+		# Initialize the TicTacToe board as a 1D numpy array filled with the Empty points.
+		# This makes it easier to check legal moves and to play moves for a particular player
+		import numpy as np
+		self.board = np.full(self.rows*self.cols, self.empty, dtype = np.int32)
+		self.clear_empty_points()
+		self.sym_keys = [0] * len(self.symmetries)
+
+	# Mark all points empty. The board keeps the empty points as a bit mask (bit pt is set if pt is empty) and their number,
+	# both updated by play_move and undo_move.
+	def clear_empty_points(self):
+		self.empty_mask = (1 << (self.rows*self.cols)) - 1
+		self.empty_count = self.rows*self.cols
+
+	# Zobrist key of the current board position. Updated in O(1) by play_move and undo_move.
+	@property
+	def key(self):
+		return self.sym_keys[0]
+
+	# Return the canonical key of the position (the smallest key among all its rotations and reflections) and the index
+	# of the symmetry that maps the position to its canonical representative.
+	def canonical(self):
+		key = min(self.sym_keys)
+		return key, self.sym_keys.index(key)
+
+	# Update the Zobrist keys of the position and of all its symmetric images for a stone of player added or removed at pt
+	def update_keys(self, pt, player):
+		self.sym_keys = [key ^ z for key, z in zip(self.sym_keys, self.zobrist[pt][player])]
+
+	# Undo a move
+	def undo_move(self, move):
+		self.update_keys(move, self.board[move])
+		self.board[move] = self.empty
+		self.empty_mask |= 1 << move
+		self.empty_count += 1
+
+	# Return the player (or empty) at a point
+	def get_color(self, pt):
+		return int(self.board[pt])
+
+	# Return the current board size (number of columns)
+	def get_board_size(self):
+		return self.board_size
+
+	# Return the number of rows and columns of the board
+	def get_dimensions(self):
+		return self.rows, self.cols
+
+	# Return the array index (pt) from the two dimensional board representation (row,col).
+	# Input is a row and column, and output is the corresponding index for it.
+	def get_pt(self, row, col):
+		return col + (self.board_size * (row-1))
+
+	# Return the two dimensional board representation (row, col) from the array index (pt).
+	def get_coord(self, pt):	
+		# The divmod() method takes two numbers and returns a pair of numbers (a tuple) consisting of their quotient and remainder.
+		# Citation: https://www.programiz.com/python-programming/methods/built-in/divmod
+		return divmod(pt, self.board_size)
+
+	# Return the legal moves (all of the empty locations on the board) as a tuple of points in increasing order.
+	def gen_legal_moves(self):
+		return legal_moves(self.empty_mask)
+
+	# Check in O(1) whether the board is full (no legal moves, a draw if nobody won)
+	def is_full(self):
+		return self.empty_count == 0
+
+	# Reset the TicTacToe board to an empty board, keeping its size.
+	def reset(self):
+		self.clear()
+
+	# Play a move for a player at a point on the board.
+	def play_move(self, player, pt):
+		self.board[pt] = player
+		self.empty_mask ^= 1 << pt
+		self.empty_count -= 1
+		self.update_keys(pt, player)
+
+	# Check to see if a player wins on not for the current board position
+	def is_winner(self, player):
+		board = self.board
+		for line in self.win_lines:
+			if all(board[pt] == player for pt in line): return True
+		return False
+
+	# Check to see if the stone at pt completes a line. Only the lines through pt are looked at, so after a move
+	# this tells whether the move won the game.
+	def wins_at(self, pt):
+		board = self.board
+		player = board[pt]
+		if player == self.empty: return False
+		for line in self.lines_through[pt]:
+			if all(board[p] == player for p in line): return True
+		return False
+
+	# Return the empty points of every win line on which player has exactly the given number of stones and the opponent none,
+	# as one tuple per line. With k-1 stones these are the points where player wins, with k-2 the points that make such a threat.
+	def open_lines(self, player, stones):
+		colors = self.board.tolist()
+		empty, opponent = self.empty, self.x_player + self.o_player - player
+		lines = []
+		for line in self.win_lines:
+			line_colors = [colors[pt] for pt in line]
+			if opponent not in line_colors and line_colors.count(player) == stones:
+				lines.append(tuple(pt for pt, color in zip(line, line_colors) if color == empty))
+		return lines
+
+
+# BitboardTicTacToeBoard Class is a TicTacToeBoard that stores the stones of each player as the bits of one integer (bit pt is set
+# if the player has a stone at pt). Playing and undoing a move is an XOR, a win check compares the player's bits with
+# precomputed line masks. It has the same interface as TicTacToeBoard.
+class BitboardTicTacToeBoard(TicTacToeBoard):
+	# Change the shape of the board (rows x cols, k in a row to win) and clear it.
+	def set_geometry(self, rows, cols, k):
+		self.line_masks, self.line_masks_through = win_line_masks(rows, cols, k)
+		TicTacToeBoard.set_geometry(self, rows, cols, k)
+
+	# Remove all stones from the board. masks[player] holds the stones of player x (1) and player o (2).
+	def clear(self):
+		self.masks = [0, 0, 0]
+		self.clear_empty_points()
+		self.sym_keys = [0] * len(self.symmetries)
+
+	# Return the player (or empty) at a point
+	def get_color(self, pt):
+		bit = 1 << pt
+		if self.masks[self.x_player] & bit: return self.x_player
+		if self.masks[self.o_player] & bit: return self.o_player
+		return self.empty
+
+	# Undo a move
+	def undo_move(self, move):
+		player = self.x_player if self.masks[self.x_player] >> move & 1 else self.o_player
+		self.masks[player] ^= 1 << move
+		self.empty_mask |= 1 << move
+		self.empty_count += 1
+		self.update_keys(move, player)
+
+	# Play a move for a player at a point on the board.
+	def play_move(self, player, pt):
+		self.masks[player] ^= 1 << pt
+		self.empty_mask ^= 1 << pt
+		self.empty_count -= 1
+		self.update_keys(pt, player)
+
+	# Check to see if a player wins on not for the current board position
+	def is_winner(self, player):
+		stones = self.masks[player]
+		for line in self.line_masks:
+			if stones & line == line: return True
+		return False
+
+	# Check to see if the stone at pt completes a line (only the lines through pt are looked at).
+	def wins_at(self, pt):
+		player = self.get_color(pt)
+		if player == self.empty: return False
+		stones = self.masks[player]
+		for line in self.line_masks_through[pt]:
+			if stones & line == line: return True
+		return False
+
+	# Return the empty points of every win line on which player has exactly the given number of stones and the opponent none
+	def open_lines(self, player, stones):
+		own, other = self.masks[player], self.masks[self.x_player + self.o_player - player]
+		return [legal_moves(line & self.empty_mask) for line in self.line_masks if not line & other and bin(line & own).count('1') == stones]
+
+
+# Board backends that can be selected with --backend (the array backend imports NumPy when a board is created)
+BOARD_BACKENDS = {'array': TicTacToeBoard, 'bitboard': BitboardTicTacToeBoard}
+
+
+# Return a new board of the given backend ('array' or 'bitboard').
+def new_board(size=3, rows=None, k=None, backend='array'):
+	return BOARD_BACKENDS[backend](size, rows, k)
+
+
+# Return the legal moves of an empty mask: the tuple of its set bits in increasing order, shared through the Legal_moves cache
+def legal_moves(empty_mask):
+	global Legal_moves_points
+	pts = Legal_moves.get(empty_mask)
+	if pts is None:
+		pts, empty = [], empty_mask
+		while empty:
+			# Lowest set bit
+			bit = empty & -empty
+			pts.append(bit.bit_length() - 1)
+			empty ^= bit
+		if Legal_moves_points + len(pts) > LEGAL_MOVES_CACHE_POINTS:
+			Legal_moves.clear()
+			Legal_moves_points = 0
+		pts = Legal_moves[empty_mask] = tuple(pts)
+		Legal_moves_points += len(pts)
+	return pts
+
+
+# Return the win lines for a rows x cols board with k in a row to win, together with the index from every point
+# to the lines that go through it. Computed once per geometry.
+def win_lines(rows, cols, k):
+	geometry = (rows, cols, k)
+	if geometry not in Win_lines:
+		lines = []
+		# Directions: row, column, diagonal and anti diagonal
+		for d_row, d_col in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+			for row in range(rows):
+				for col in range(cols):
+					end_row, end_col = row + d_row*(k-1), col + d_col*(k-1)
+					if 0 <= end_row < rows and 0 <= end_col < cols:
+						lines.append(tuple((row + d_row*i)*cols + col + d_col*i for i in range(k)))
+		lines_through = [[] for pt in range(rows*cols)]
+		for line in lines:
+			for pt in line: lines_through[pt].append(line)
+		Win_lines[geometry] = (lines, [tuple(through) for through in lines_through])
+	return Win_lines[geometry]
+
+
+# Return the win lines of a board geometry as bit masks, together with the masks of the lines through every point.
+def win_line_masks(rows, cols, k):
+	geometry = (rows, cols, k)
+	if geometry not in Win_line_masks:
+		lines, lines_through = win_lines(rows, cols, k)
+		def to_mask(line): return sum(1 << pt for pt in line)
+		Win_line_masks[geometry] = ([to_mask(line) for line in lines], [tuple(to_mask(line) for line in through) for through in lines_through])
+	return Win_line_masks[geometry]
+
+
+# Return the symmetries of a rows x cols board as point permutations (symmetry[pt] is the image of pt), together with their
+# inverses. The first one is the identity. A square board has 8 (rotations and reflections), any other board has 4.
+# Every symmetry maps win lines to win lines, so symmetric positions have the same value.
+def symmetries(rows, cols):
+	if (rows, cols) not in Symmetries:
+		last_row, last_col = rows - 1, cols - 1
+		transforms = [lambda r, c: (r, c), lambda r, c: (last_row - r, last_col - c),
+			lambda r, c: (last_row - r, c), lambda r, c: (r, last_col - c)]
+		if rows == cols:
+			transforms += [lambda r, c: (c, r), lambda r, c: (last_col - c, last_row - r),
+				lambda r, c: (c, last_row - r), lambda r, c: (last_col - c, r)]
+		perms = []
+		for transform in transforms:
+			perms.append(tuple(row*cols + col for row, col in (transform(*divmod(pt, cols)) for pt in range(rows*cols))))
+		inverses = []
+		for perm in perms:
+			inverse = [0] * len(perm)
+			for pt, image in enumerate(perm): inverse[image] = pt
+			inverses.append(tuple(inverse))
+		Symmetries[(rows, cols)] = (perms, inverses)
+	return Symmetries[(rows, cols)]
+
+
+# Return the Zobrist keys for a board geometry (rows, cols, k). table[pt][player] is the tuple of keys, one per symmetry, that a
+# stone of player at pt adds to the key of each symmetric image of the position. The empty point always has keys 0.
+# Every geometry gets its own keys so that positions from different geometries do not share transposition table entries.
+def zobrist_table(geometry):
+	if geometry not in Zobrist_tables:
+		rows, cols, k = geometry
+		rng = random.Random("{} {}x{} k={}".format(ZOBRIST_SEED, rows, cols, k))
+		keys = [(0, rng.getrandbits(64), rng.getrandbits(64)) for pt in range(rows*cols)]
+		perms = symmetries(rows, cols)[0]
+		Zobrist_tables[geometry] = [tuple(tuple(keys[perm[pt]][player] for perm in perms) for player in range(3)) for pt in range(rows*cols)]
+	return Zobrist_tables[geometry]
+
+
+# Returns the associated integer of a particular player. For exampe: player x = 1, player 2 = 0
+def player_to_int(player):
+	return ['.', 'x', 'o'].index(str(player))
+
+# Returns the associated player of a particular integer ranging from [0, 2]. For exampe: player x = 1, player 2 = 0
+def int_to_player(int_code):
+	return ['.', 'x', 'o'][int_code]
+
+# Return the string format of a move. For example: If move = (2,2), then the string format for the move is c3.
+def move_to_string(move):
+	row, col = move
+	return COLUMN_LETTERS[col]+ str(row+1)
+
+# Return the two dimensional board representation (row, col) from the the string format of a move. 
+# For example: If string move = c3, then the two dimensional board representation of the move (2,2)
+def string_to_move(str_move, board):
+	col_string, row = str_move[0], str_move[1:]
+	# Check to make sure the column string is a column letter between a...z, if not return -1
+	# Convert the column string to a number format: its position in the column letters (the letter i is skipped)
+	col = COLUMN_LETTERS.find(col_string)
+	rows, cols = board.get_dimensions()
+
+	# Check to make sure the column and row entered is within the bounds of the board.
+	if not (0 <= col < cols): return -1
+	if not row.isdigit() or not (0 < int(row) <= rows): return -1
+	return int(row), col
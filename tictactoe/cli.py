@@ -0,0 +1,406 @@
+# Command line interface of the TTT program: command parsing, board display and the interactive loop.
+import random
+import struct
+import sys
+from sys import argv, stdin, stdout
+from . import search, stats
+from .board import BOARD_BACKENDS, COLUMN_LETTERS, MAX_BOARD_SIZE, new_board, player_to_int, int_to_player, move_to_string, string_to_move
+from .protocol import ProtocolError, game_result, gen_move_outcomes, gen_options, seed_command, serve_lines
+from .search import get_legal_move_outcomes
+from .threats import winning_points
+
+# Number of processes gen and t split the root moves across (--processes), None searches in this process
+Search_processes = None
+# Random number generator of genr, the tie-breaks of gen and t and the MCTS playouts, seeded by the seed command (or --seed)
+Game_rng = random.Random()
+
+stonecolors = ('\033[' + '0;37m', '\033[' + '0;35m', '\033[' + '0;32m', '\033[' + '0;37m')
+
+
+# Show error message and the Help Screen to the player when a error occurs with the command line input
+def error_response(message):
+	print('\n\n' + stonecolors[1] + message + '\033[' + '0m')
+	game_menu()
+
+# Show the input board
+# I referenced from the simple programs ttt2 program (Cmput355/games-puzzles-algorithms/simple/ttt/ttt2)
+def show_board(board):
+	print('\n'+stonecolors[0] + "BOARD:" + '\033[' + '0m')
+
+	# paint outputs the a neat coloring to the board headers (Rows/Columns) and the board cells
+	def paint(char): 
+		if len(char)>1 and char[0]==' ': 
+			return ' ' + paint(char[1:])
+		x = '.xo'.find(char[0])
+		if x > 0:
+			return stonecolors[x] + char + '\033[' + '0m'
+		elif char.isalnum():
+			return '\033[' + '0;37m' + char + '\033[' + '0m'
+		return char
+
+	rows, cols = board.get_dimensions()
+	board_string = '   '
+
+	# Print the Headers for the columns (Ex: a....z) depends on the size of the board
+	for col in range(cols):
+		board_string += ' ' + paint(COLUMN_LETTERS[col])
+	board_string += '\n'
+
+	# Iterate through the rows of the board
+	for row in range(rows):
+		# Print the row index depends on the size of the board
+		board_string += ' ' + paint(str(1+row)) + ' '
+		# Iterate through the columns of the board
+		for col in range(cols):
+			pt = board.get_pt(1+row, col)
+			player = int_to_player(board.get_color(pt))
+			board_string += ' ' + paint(player)
+
+		board_string += '\n'
+	print(board_string)
+
+# Game Menu containing the valid input commands available to the player. 
+# I referenced the help menu from the printmenu function in the ttt2 program (Cmput355/games-puzzles-algorithms/simple/ttt/ttt2)
+def game_menu():
+	print('\n'+stonecolors[0] + 'Commands			Descriptions' +'\033[' + '0m')
+	print("--------------			---------------------------")
+	print("H / h             		- Help Menu")
+	print("play [x/o] [a2]    		- Play x or o at move a2")
+	print("gen [x/o]			- Generate a move for player x or o using MiniMax Algorithm")
+	print("gen [x/o] time [ms]		- Generate a move searching for at most ms milliseconds (iterative deepening)")
+	print("gen [x/o] nodes [n]		- Generate a move searching at most n nodes (iterative deepening)")
+	print("gen [x/o] mcts [n]		- Generate a move with n iterations of Monte Carlo tree search")
+	print("gen [x/o] mcts time [ms]	- Generate a move with ms milliseconds of Monte Carlo tree search")
+	print("genr [x/o]			- Generate a random move for player x or o")
+	print("t 				- Tutor/Visualizer (Shows Legal moves and move results for both players)")
+	print("show				- Show board")
+	print("result 				- States the winner of the game [x/o/unknown]")
+	print("r				- Reset the board")
+	print("size [n] / size [n] [k]		- Play on an n x n board with k in a row to win (k = n by default)")
+	print("size [rows] [cols] [k]		- Play on a rows x cols board with k in a row to win")
+	print("tt [save/load/clear] [file]	- Transposition table statistics, save/load it to a file or clear it (and the tutor cache)")
+	print("stats [on [file]/off/reset]	- Search statistics of gen and t, turn them on (JSON lines to file) or off")
+	print("seed [n]			- Seed the random moves and tie-breaks with n (a new random seed without n) to repeat a game")
+	print("Q / q           		- Quit Program")
+	print("--------------			---------------------------\n\n")
+
+# Parse the command line string and execute the command. Return True when the player quits.
+def cmds(cmd_string, board):
+	# Parse the command line string to obtain the command name and the arguments for the command.
+	# Example: command string: "play x a2"	-> command name = "play" and the arguments = ["x", "a2"]
+	# File names keep their case: file_args are the arguments as they were typed.
+	cmd_list = (cmd_string.lower()).split()
+	if len(cmd_list) == 0: return 
+	cmd_name, cmd_args = cmd_list[0], cmd_list[1:]
+	file_args = cmd_string.split()[1:]
+
+	# Quit Game Command
+	if cmd_name == "q":
+		# Validate the command arguments 
+		if len(cmd_args) != 0: return error_response("- Invalid number of Arguments for the Quit Command")
+		print("GAME OVER!\n")
+		return True
+
+	# Help Menu Command
+	elif cmd_name == 'h':
+		if len(cmd_args) != 0: return error_response("- Invalid number of Arguments for the Help Command")
+		game_menu()
+
+	# Play Commmand
+	elif cmd_name == 'play':
+		# Validate the command arguments 
+		# Check to make sure the number of arguments is two (player and move) and that the move has a minimum length of two (Ex: a2, b10)
+		if len(cmd_args) != 2: return error_response("- Invalid number of Arguments for the Play Command")
+		if len(cmd_args[1]) < 2: return error_response("- Invalid Move Location for the Play Command")
+
+		# Check to make sure the player is x or o
+		if cmd_args[0] not in ['x', 'o']: return error_response("- Invalid Player [Valid Players:'x' or 'o']")
+
+		# Convert the string format of the move to the two dimensional board representation (row, col)
+		move = string_to_move(cmd_args[1].lower(), board)
+		if move == -1: return error_response('- Invalid Move Location for the Play Command')
+
+		pt = board.get_pt(move[0], move[1])
+		player = player_to_int(cmd_args[0])
+
+		# Check to see if the pt is a legal move. 
+		if board.get_color(pt) != board.empty: 
+			print(stonecolors[1] + '- Invalid Move Location (Move is currently occupied)' + '\033[' + '0m' +'\n')
+			show_board(board)
+			return 
+
+		# Function call to the play the move for the player if no errors occured when validating the arguments
+		return play_move(board, player, pt)
+
+	# Generates a move using the negamax algorithm to find best available move for a player
+	elif cmd_name == 'gen':
+		# Validate the command arguments 
+		# Check to make sure the player is x or o
+		if len(cmd_args) == 0 or cmd_args[0] not in ['x', 'o']: return error_response("- Invalid Player [Valid Players:'x' or 'o']")
+		player = player_to_int(cmd_args[0])
+
+		# Check the engine and the budget of the search (see protocol.gen_options)
+		try: engine, budget = gen_options(cmd_args, board)
+		except ProtocolError as error: return error_response("- " + str(error))
+
+		# Compute the minimax values (or the MCTS visit counts) for a player for all legal moves.
+		pts, vals = gen_move_outcomes(board, player, engine, budget, processes=Search_processes, verbose=True, rng=Game_rng)
+
+		# Check to see if there are no legal moves
+		if len(pts) == 0: 
+			print(stonecolors[1] + '- No more legal moves' + '\033[' + '0m' +'\n')
+			show_board(board)
+			return 
+
+		# Find all the best pts and choose one at random
+		best_val = max(vals)
+		pt = Game_rng.choice([pt for pt, val in zip(pts, vals) if val == best_val])
+
+		# Play the best move
+		stdout.write('= {}\n\n'.format(move_to_string(board.get_coord(pt))))
+		stdout.flush()
+		return play_move(board, player, pt)
+
+	# Generates a random move from the list of legal moves for a player and plays it for them.
+	elif cmd_name == 'genr':
+		# Validate the command arguments 
+		# Check to make sure the number of arguments is 1 (player)
+		if len(cmd_args) != 1: return error_response("- Invalid number of Arguments for the Generate Random move Command")
+
+		# Check to make sure the player is x or o
+		if cmd_args[0] not in ['x', 'o']: return error_response("- Invalid Player [Valid Players:'x' or 'o']")
+		player = player_to_int(cmd_args[0])
+
+		# Get all legal moves for the board and check to make sure their exists at least 1 legal move
+		legal_moves = board.gen_legal_moves()
+		if len(legal_moves) == 0:
+			print(stonecolors[1] + '- No more legal moves' + '\033[' + '0m' +'\n')
+			show_board(board)
+			return 
+
+		# Randomly select a move from the list of legal moves and function call to play move for the player
+		pt = int(Game_rng.choice(legal_moves))
+		stdout.write('= {}\n\n'.format(move_to_string(board.get_coord(pt))))
+		stdout.flush()
+		return play_move(board, player, pt)
+
+	# Tutor/Visualizer: Provide the legal moves for both player's and the game outcomes for the legal moves.
+	elif cmd_name == 't':
+		# Validate the command arguments 
+		if len(cmd_args) != 0: return error_response("- Invalid number of Arguments for the Tutor/Visualizer Command")
+		outcome_possibilites = { -1: "Loss", 0: "Draw", 1:"Win"}
+
+		# Check to see if there are no legal moves (the same for both players)
+		if board.is_full():
+			print(stonecolors[1] + '- No more legal moves (Result: ' + game_result(board) + ')' + '\033[' + '0m' +'\n')
+			show_board(board)
+			return
+
+		# Show the legal moves for a player x/o and the outocomes for the moves. Along with the suggest move to make for player x/o.
+		for player in range(1,3):
+			pts, vals = get_legal_move_outcomes(board, player, threat_check=True, exact=True, verbose=True, processes=Search_processes)
+
+			# Format the move and the outcomes to look visually pleasing for the player
+			moves = [move_to_string(board.get_coord(pt)) for pt in pts]
+			outcomes = [str(val) + " (" + outcome_possibilites[val] + ")" for val in vals]
+
+			# Find suggest move: a best move, an immediate win if there is one (a block of the opponent's threat is the only
+			# move that does not lose, so it is a best move already). Else choose one of the best moves at random.
+			best_val = max(vals)
+			best_pts = [pt for pt, val in zip(pts, vals) if val == best_val]
+			win_pts = [pt for pt in winning_points(board, player) if pt in best_pts]
+			best_pt = win_pts[0] if win_pts else Game_rng.choice(best_pts)
+
+			suggested_move = move_to_string(board.get_coord(best_pt))
+			print(stonecolors[0] + "Information for player " + int_to_player(player)+ ": " + '\033[' + '0m')
+			print("Legal moves: [" + ", ".join(moves) + "]")
+			print("Suggested move for player " + int_to_player(player) + ": " + suggested_move)
+
+			# Print the headers
+			for title in ['Move', 'Outcome']: 
+				print("\t" + stonecolors[0] + title + '\033[' + '0m', end="")
+
+			print("\n\t-----\t-------------")
+			for index in range(len(moves)):
+				print("\t" + stonecolors[1] + moves[index] + "\t" + outcomes[index] + '\033[' + '0m')
+			print('\n')
+
+	# Transposition table: show its statistics, save it to or load it from a file, or clear it
+	elif cmd_name == 'tt':
+		if len(cmd_args) == 0:
+			table = search.Transposition_table
+			print("Entries: {} / {}".format(len(table), table.num_slots if table.recent is None else 2*table.num_slots))
+			print("Hits: {}  Misses: {}  Collisions: {}  Stores: {}\n".format(table.hits, table.misses, table.collisions, table.stores))
+		elif cmd_args[0] == 'clear' and len(cmd_args) == 1:
+			search.Transposition_table.clear()
+			search.Exact_outcomes.clear()
+		elif cmd_args[0] in ['save', 'load'] and len(cmd_args) == 2:
+			try:
+				if cmd_args[0] == 'save': search.Transposition_table.save(file_args[1])
+				else: print("Loaded {} entries\n".format(search.Transposition_table.load(file_args[1])))
+			except (OSError, ValueError, struct.error) as error:
+				return error_response("- Transposition table " + cmd_args[0] + " failed: " + str(error))
+		else: return error_response("- Invalid Arguments for the Transposition Table Command")
+
+	# Search statistics: show the last move and the totals, turn them on (optionally logging JSON lines to a file), off or reset them
+	elif cmd_name == 'stats':
+		current = search.Search_stats
+		if len(cmd_args) == 0:
+			if current is None: print("Statistics are off (stats on [file] turns them on)\n")
+			elif not current.records: print("No moves computed yet\n")
+			else:
+				for title, values in [('Last move', current.records[-1]), ('Totals', current.totals())]:
+					print(stonecolors[0] + title + ':' + '\033[' + '0m')
+					print("  ".join("{}: {}".format(name, value) for name, value in values.items()) + '\n')
+		elif cmd_args[0] == 'on' and len(cmd_args) <= 2:
+			try: stats.enable(file_args[1] if len(cmd_args) == 2 else None)
+			except OSError as error: return error_response("- Statistics log file failed: " + str(error))
+		elif cmd_args[0] == 'off' and len(cmd_args) == 1:
+			stats.disable()
+		elif cmd_args[0] == 'reset' and len(cmd_args) == 1:
+			if current is not None: stats.enable(current.log_file)
+		else: return error_response("- Invalid Arguments for the Statistics Command")
+
+	# Seed the random number generator of the game and show the seed
+	elif cmd_name == 'seed':
+		try: seed = seed_command(cmd_args, Game_rng)
+		except ProtocolError as error: return error_response("- " + str(error))
+		stdout.write('= {}\n\n'.format(seed))
+		stdout.flush()
+
+	# Show Board
+	elif cmd_name == 'show':
+		if len(cmd_args) != 0: return error_response("- Invalid number of Arguments for the Show Command")
+		show_board(board)
+
+	# State the result of the game: X won, O won, draw, unknown
+	elif cmd_name == 'result':
+		if len(cmd_args) != 0: return error_response("- Invalid number of Arguments for the Result Command")
+		# Outout the result
+		stdout.write('= {}\n\n'.format(game_result(board)))
+		stdout.flush()
+
+	# Board Size: change the board geometry (rows x cols, k in a row to win) and start a new game
+	elif cmd_name == 'size':
+		# Validate the command arguments
+		if not 1 <= len(cmd_args) <= 3: return error_response("- Invalid number of Arguments for the Size Command")
+		if not all(arg.isdigit() for arg in cmd_args): return error_response("- Invalid Arguments for the Size Command (Arguments must be numbers)")
+		numbers = [int(arg) for arg in cmd_args]
+		if len(numbers) == 3: rows, cols, k = numbers
+		else: rows, cols, k = numbers[0], numbers[0], numbers[-1]
+
+		# Check to make sure the board fits on the screen and that a line of k stones fits on the board
+		if not (1 <= rows <= MAX_BOARD_SIZE and 1 <= cols <= MAX_BOARD_SIZE):
+			return error_response("- Invalid Board Size [Rows and columns must be between 1 and {}]".format(MAX_BOARD_SIZE))
+		if not 1 <= k <= max(rows, cols): return error_response("- Invalid Win Length [k must be between 1 and the longest side of the board]")
+
+		board.set_geometry(rows, cols, k)
+		show_board(board)
+
+	# Reset Board
+	elif cmd_name == 'r':
+		if len(cmd_args) != 0: return error_response("- Invalid number of Arguments for the Reset Command")
+		board.reset()
+		show_board(board)
+
+	# Invalid Command Name entered, show the error message and show the help menu.
+	else:
+		error_response('- Invalid Command Name')
+
+
+# Play move for a player and check if win exists. Return True when the player then quits.
+def play_move(board, player, pt):
+	board.play_move(player, pt)
+	show_board(board)
+	# Check if win exists
+	is_win = board.wins_at(pt)
+	if is_win:
+		stdout.write('= {}\n\n'.format(int_to_player(player)))
+		stdout.flush()
+
+		# Print winning message
+		print('\n'+stonecolors[0] + 'Player '+int_to_player(player)+ ' Wins'+'\033[' + '0m')
+		return play_again(board)
+
+
+# Ask player to play again or quit. According to their response either reset the board for a new game or return True to quit the program.
+def play_again(board):
+	# Check if player wants to play again (the end of the input quits)
+	while True:
+		try: play_again = input(stonecolors[0] + 'Do you want to play again (y/n): ' +'\033[' + '0m')
+		except EOFError: play_again = "n"
+		play_again = play_again.lower()
+		# Play again
+		if play_again == "y": 
+			board.reset()
+			print("NEW GAME: ")
+			show_board(board)
+			return
+		# Quit Program
+		elif play_again == "n": 
+			print("GAME OVER!\n")
+			return True
+		# Invalid Input
+		else: print(stonecolors[1] + 'Invalid Input' + '\033[' + '0m')
+
+
+# Intro message to the player
+def intro_prompt():
+	print(stonecolors[0] + 'Welcome to HM\'s TTT Program!' + '\033[' + '0m')
+	print(stonecolors[0] + 'Program Commands are the following:' + '\033[' + '0m')
+	game_menu()
+
+
+# The interact function handles all player interaction with the TTT program
+# With quiet, commands get only the terse replies of the protocol mode (see protocol.py) and nothing is rendered.
+# A seed makes the random moves and tie-breaks repeatable (like the seed command).
+def interact(backend='bitboard', processes=None, quiet=False, seed=None):
+	global Search_processes
+	Search_processes = processes
+	Game_rng.seed(seed)
+
+	# Instantiate a TicTacToe board (board size is 3x3)
+	board = new_board(3, backend=backend)
+	if quiet: return serve_lines(board, stdin, stdout, processes, seed)
+
+	# Show Prompt messages to welcome the player and show the help menu
+	intro_prompt()
+	show_board(board)
+
+	# Read command line infinitely until player decides to quit
+	cmd_line= stdin.readline()
+	while cmd_line:
+		# Function call to parse and execute the player's command
+		if cmds(cmd_line, board): return
+		cmd_line = stdin.readline()
+
+
+# Parse the program arguments. Supported: --backend [array/bitboard], --processes [n] (parallel search for gen and t),
+# --quiet (protocol mode for scripted clients), --seed [n] (seed of the random moves) and --build-solutions (build the 3x3
+# solution table and quit)
+def parse_args(args):
+	if '--build-solutions' in args:
+		from .solutions import build_solution_table, solution_file
+		count = build_solution_table()
+		sys.exit("Solved {} positions: {}".format(count, solution_file((3, 3, 3))))
+	options = {'backend': 'bitboard', 'quiet': '--quiet' in args}
+	if '--backend' in args:
+		index = args.index('--backend')
+		if index + 1 >= len(args) or args[index + 1] not in BOARD_BACKENDS:
+			sys.exit("Invalid backend [Valid backends: " + ", ".join(BOARD_BACKENDS) + "]")
+		options['backend'] = args[index + 1]
+	if '--processes' in args:
+		index = args.index('--processes')
+		if index + 1 >= len(args) or not args[index + 1].isdigit() or int(args[index + 1]) == 0:
+			sys.exit("Invalid number of processes (Must be a positive integer)")
+		options['processes'] = int(args[index + 1])
+	if '--seed' in args:
+		index = args.index('--seed')
+		if index + 1 >= len(args) or not args[index + 1].isdigit(): sys.exit("Invalid seed (Must be a non-negative integer)")
+		options['seed'] = int(args[index + 1])
+	return options
+
+
+# Start the player interaction with the TicTacToe program
+def main():
+	interact(**parse_args(argv[1:]))
@@ -0,0 +1,228 @@
+# Headless match engine: plays games between player strategies directly on TicTacToeBoard objects,
+# without starting any ttt.py processes and without any terminal output.
+import os
+import random
+import numpy as np
+from multiprocessing import Pool
+from .board import new_board, move_to_string
+from .mcts import mcts_move_outcomes, reset_tree
+from .records import DRAW, O_WINS, X_WINS, GameRecord, RecordWriter
+from .search import get_legal_move_outcomes
+from .threats import winning_points
+
+# Iterations of the MCTS strategy per move
+MCTS_STRATEGY_ITERATIONS = 1000
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Game Results')
+# Game results (player x wins, player o wins or draw) are X_WINS, O_WINS and DRAW of records.py
+
+
+# Random strategy (Weak Player): play any legal move.
+def random_strategy(board, player, rng):
+	return int(rng.choice(board.gen_legal_moves()))
+
+
+# Threat strategy: play a winning move, else block a winning move of the opponent, else play any legal move.
+def threat_strategy(board, player, rng):
+	for threat_player in (player, board.x_player + board.o_player - player):
+		pts = winning_points(board, threat_player)
+		if pts: return int(pts[0])
+	return int(rng.choice(board.gen_legal_moves()))
+
+
+# Negamax strategy (Strong Player): the same move choice as the gen command (threat search, then the best negamax moves).
+def negamax_strategy(board, player, rng):
+	pts, vals = get_legal_move_outcomes(board, player, threat_check=True)
+	best_val = max(vals)
+	return int(rng.choice([pt for pt, val in zip(pts, vals) if val == best_val]))
+
+
+# MCTS strategy: the most visited move of a Monte Carlo tree search. The playouts draw from the generator of the game and the
+# kept tree is dropped at the first move of each player, so games stay reproducible under a seed.
+def mcts_strategy(board, player, rng):
+	if board.empty_count >= board.rows * board.cols - 1: reset_tree()
+	pts, visits = mcts_move_outcomes(board, player, MCTS_STRATEGY_ITERATIONS, rng=rng)
+	best_visits = max(visits)
+	return int(rng.choice([pt for pt, count in zip(pts, visits) if count == best_visits]))
+
+
+# Registered strategies: name -> (move function, label used in the result file names, description used in the result files).
+# A move function (board, player, rng) returns the point to play and draws every random choice from rng, the random.Random of the game.
+STRATEGIES = {
+	'random': (random_strategy, 'weak', "Player using random move selection (Weak Player)"),
+	'threat': (threat_strategy, 'threat', "Player using Threat Search and random move selection"),
+	'negamax': (negamax_strategy, 'strong', "Player using Negamax and Threat Search (Strong Player)"),
+	'mcts': (mcts_strategy, 'mcts', "Player using Monte Carlo Tree Search"),
+}
+
+
+# Play one game between two strategies, player x moving first, with the random choices drawn from rng (a random.Random, a new
+# unseeded one if None). Return the list of moves (points) and the result (X_WINS/O_WINS/DRAW).
+def play_game(x_strategy, o_strategy, board=None, rng=None):
+	if board is None: board = new_board(3, backend='bitboard')
+	else: board.reset()
+	if rng is None: rng = random.Random()
+	strategies = {board.x_player: STRATEGIES[x_strategy][0], board.o_player: STRATEGIES[o_strategy][0]}
+	player, moves = board.x_player, []
+	while not board.is_full():
+		pt = strategies[player](board, player, rng)
+		board.play_move(player, pt)
+		moves.append(pt)
+		if board.wins_at(pt): return moves, (X_WINS if player == board.x_player else O_WINS)
+		player = board.x_player + board.o_player - player
+	return moves, DRAW
+
+
+# Play number_of_games games between two strategies on one board, drawing from one generator seeded with seed (None seeds it
+# from the operating system). Return the list of (moves, result) of every game.
+def play_games(x_strategy, o_strategy, number_of_games, board=None, seed=None):
+	if board is None: board = new_board(3, backend='bitboard')
+	rng = random.Random(seed)
+	return [play_game(x_strategy, o_strategy, board, rng) for game in range(number_of_games)]
+
+
+# Return the number of x wins, o wins and draws of a list of (moves, result) games
+def count_results(games):
+	results = [result for moves, result in games]
+	return results.count(X_WINS), results.count(O_WINS), results.count(DRAW)
+
+
+# Return the game log text of a list of games, in the format of the game_log files
+def game_log(games, board):
+	result_strings = {X_WINS: "Result: Player x wins", O_WINS: "Result: Player o wins", DRAW: "Result: Draw"}
+	lines = []
+	for game, (moves, result) in enumerate(games, 1):
+		if game > 1: lines.append("")
+		lines.append("GAME #" + str(game) + ": ")
+		for index, pt in enumerate(moves):
+			lines.append("Player " + "xo"[index % 2] + ": " + move_to_string(board.get_coord(pt)) + "\n")
+		lines.append(result_strings[result])
+	wins_x, wins_o, draws = count_results(games)
+	lines += ["Player x wins: " + str(wins_x), "Player o wins: " + str(wins_o), "Draws: " + str(draws)]
+	return "\n".join(lines) + "\n"
+
+
+# Play a match between two strategies and write the game_log and game_results files under "Game Results".
+# With a record_file, the games are also appended to that game record file (see records.py). A seed repeats the match.
+# Return the number of x wins, o wins and draws.
+def run_match(x_strategy, o_strategy, number_of_games=50, results_dir=RESULTS_DIR, record_file=None, seed=None):
+	board = new_board(3, backend='bitboard')
+	games = play_games(x_strategy, o_strategy, number_of_games, board, seed)
+	wins_x, wins_o, draws = count_results(games)
+	if record_file is not None:
+		with RecordWriter(record_file, append=True) as writer:
+			for moves, result in games: writer.write(GameRecord(board.geometry, x_strategy, o_strategy, None, moves, result))
+
+	name = STRATEGIES[x_strategy][1] + "_vs_" + STRATEGIES[o_strategy][1]
+	os.makedirs(results_dir, exist_ok=True)
+	with open(os.path.join(results_dir, "game_log_" + name + ".txt"), "w") as f:
+		f.write(game_log(games, board))
+	with open(os.path.join(results_dir, "game_results_" + name + ".txt"), "w") as f:
+		f.write("player x: {} \n".format(STRATEGIES[x_strategy][2]))
+		f.write("player o: {} \n".format(STRATEGIES[o_strategy][2]))
+		f.write("Player x wins: {}\n".format(str(wins_x)))
+		f.write("Player o wins: {}\n".format(str(wins_o)))
+		f.write("Draws: {}\n".format(str(draws)))
+	return wins_x, wins_o, draws
+
+
+# Board of a tournament worker process, created on its first game
+Worker_board = None
+
+
+# Play one tournament shard in a worker process: the games with the given numbers between two strategies.
+# Every game draws from a generator seeded with its own seed, so a game can be replayed from its seed alone.
+# Return a list of (x strategy, o strategy, game number, seed, moves, result).
+def play_shard(shard):
+	global Worker_board
+	if Worker_board is None: Worker_board = new_board(3, backend='bitboard')
+	x_strategy, o_strategy, games, seeds = shard
+	records = []
+	for game, seed in zip(games, seeds):
+		moves, result = play_game(x_strategy, o_strategy, Worker_board, random.Random(seed))
+		records.append((x_strategy, o_strategy, game, seed, moves, result))
+	return records
+
+
+# Return the seed of a tournament game, derived from the tournament seed, the pairing and the game number
+def game_seed(seed, x_strategy, o_strategy, game):
+	names = sorted(STRATEGIES)
+	state = np.random.SeedSequence([seed, names.index(x_strategy), names.index(o_strategy), game]).generate_state(1)
+	return int(state[0])
+
+
+# Return the 95% Wilson score confidence interval of a proportion of count out of total
+def wilson_interval(count, total, z=1.96):
+	if total == 0: return 0.0, 1.0
+	p = count / total
+	center = (p + z*z / (2*total)) / (1 + z*z / total)
+	spread = z * ((p*(1 - p) + z*z / (4*total)) / total) ** 0.5 / (1 + z*z / total)
+	return max(0.0, center - spread), min(1.0, center + spread)
+
+
+# Run a round-robin tournament: every ordered pairing of the strategies (each strategy plays both x and o, including against
+# itself) plays number_of_games games. The games are split into shards of shard_size games that are played by a pool of
+# processes. Every finished game is written to the log file as soon as its shard is done, and to the game record file
+# record_file (see records.py) if given.
+# Return a dictionary from (x strategy, o strategy) to the number of x wins, o wins and draws.
+def run_tournament(strategies=None, number_of_games=100, processes=None, seed=0, shard_size=25, log_file=None, record_file=None):
+	strategies = strategies or sorted(STRATEGIES)
+	log_file = log_file or os.path.join(RESULTS_DIR, "tournament_log.txt")
+	shards = []
+	for x_strategy in strategies:
+		for o_strategy in strategies:
+			for start in range(0, number_of_games, shard_size):
+				games = list(range(start + 1, min(number_of_games, start + shard_size) + 1))
+				seeds = [game_seed(seed, x_strategy, o_strategy, game) for game in games]
+				shards.append((x_strategy, o_strategy, games, seeds))
+
+	board = new_board(3, backend='bitboard')
+	totals = {(x_strategy, o_strategy): [0, 0, 0] for x_strategy in strategies for o_strategy in strategies}
+	os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+	writer = None if record_file is None else RecordWriter(record_file)
+	try:
+		with Pool(processes) as pool, open(log_file, "w") as log:
+			log.write("# x o game seed result moves\n")
+			for records in pool.imap_unordered(play_shard, shards):
+				for x_strategy, o_strategy, game, seed, moves, result in records:
+					totals[(x_strategy, o_strategy)][result - 1] += 1
+					moves_string = " ".join(move_to_string(board.get_coord(pt)) for pt in moves)
+					log.write("{} {} {} {} {} {}\n".format(x_strategy, o_strategy, game, seed, "-xod"[result], moves_string))
+					if writer is not None: writer.write(GameRecord(board.geometry, x_strategy, o_strategy, seed, moves, result))
+				log.flush()
+	finally:
+		if writer is not None: writer.close()
+	return {pairing: tuple(counts) for pairing, counts in totals.items()}
+
+
+# Return the tournament results as a table: win/draw/loss counts and rates of player x with 95% confidence intervals
+def tournament_table(totals):
+	lines = ["{:<10}{:<10}{:>7}{:>8}{:>8}{:>8}   {:<22}{:<22}{:<22}".format(
+		"x", "o", "games", "x wins", "draws", "o wins", "x win rate", "draw rate", "x loss rate")]
+	for (x_strategy, o_strategy), (wins_x, wins_o, draws) in sorted(totals.items()):
+		games = wins_x + wins_o + draws
+		rates = []
+		for count in (wins_x, draws, wins_o):
+			low, high = wilson_interval(count, games)
+			rates.append("{:.3f} [{:.3f}, {:.3f}]".format(count / games if games else 0.0, low, high))
+		lines.append("{:<10}{:<10}{:>7}{:>8}{:>8}{:>8}   {:<22}{:<22}{:<22}".format(
+			x_strategy, o_strategy, games, wins_x, draws, wins_o, *rates))
+	return "\n".join(lines)
+
+
+# Command line: python3 -m tictactoe.match tournament [--games N] [--processes N] [--seed N] [--log FILE] [--records FILE]
+#                                                    [--strategies a,b,...]
+if __name__ == '__main__':
+	import argparse
+	parser = argparse.ArgumentParser(description="Play tic-tac-toe matches between strategies")
+	parser.add_argument('command', choices=['tournament'])
+	parser.add_argument('--games', type=int, default=100, help="games per pairing")
+	parser.add_argument('--processes', type=int, default=None, help="worker processes (default: one per core)")
+	parser.add_argument('--seed', type=int, default=0, help="tournament seed")
+	parser.add_argument('--log', default=None, help="per-game log file")
+	parser.add_argument('--records', default=None, help="game record file (see records.py)")
+	parser.add_argument('--strategies', default=None, help="comma separated strategies (default: all)")
+	args = parser.parse_args()
+	strategies = args.strategies.split(',') if args.strategies else None
+	if strategies and any(strategy not in STRATEGIES for strategy in strategies):
+		parser.error("unknown strategy [valid strategies: " + ", ".join(STRATEGIES) + "]")
+	print(tournament_table(run_tournament(strategies, args.games, args.processes, args.seed, log_file=args.log, record_file=args.records)))
@@ -0,0 +1,163 @@
+# Monte Carlo tree search (UCT with random playouts), the engine of gen [x/o] mcts.
+# The search runs for a number of iterations or a time budget. The tree of the last search is kept, and the next search starts
+# from the node of its position if it is in the tree (after the move played and the reply of the opponent), so the visits
+# spent on that part of the tree are not lost. With more than one process the search is root parallel: every worker process
+# grows its own tree from the position and the visit counts of the root moves are added up.
+import math
+import random
+import time
+from .parallel import board_backend, board_stones, get_search_pool, worker_board
+
+# Exploration constant of the UCT formula
+UCT_C = math.sqrt(2)
+# Iterations of gen [x/o] mcts without a number
+DEFAULT_MCTS_ITERATIONS = 5000
+# A kept tree is reused if the new position is at most this many moves below its root
+REUSE_PLIES = 2
+# Iterations between two reads of the clock with a time budget
+CLOCK_INTERVAL = 64
+
+# Tree of the last search: (geometry, root node), None before the first search
+Mcts_tree = None
+
+
+# Node of the search tree: the position after the move pt (None at the root) played by mover.
+# Parameter value sums the playout rewards for mover: 1 for a win, 0.5 for a draw and 0 for a loss.
+# Parameter result is set for the end of the game: 1 if the move won, 0.5 for a draw.
+class MCTSNode:
+	__slots__ = ('pt', 'mover', 'key', 'parent', 'children', 'untried', 'visits', 'value', 'result')
+
+	def __init__(self, board, pt, mover, parent, result=None):
+		self.pt = pt
+		self.mover = mover
+		self.key = board.key
+		self.parent = parent
+		self.children = []
+		self.untried = [] if result is not None else [int(move) for move in board.gen_legal_moves()]
+		self.visits = 0
+		self.value = 0.0
+		self.result = result
+
+	# Return the child with the best UCT score
+	def select_child(self):
+		log_visits = math.log(self.visits)
+		return max(self.children, key=lambda child: child.value / child.visits + UCT_C * math.sqrt(log_visits / child.visits))
+
+
+# Return the node of the position (key, player to move) in the kept tree if it is at most REUSE_PLIES below the root, else None.
+# The player to move at a node is the opponent of its mover.
+def find_subtree(geometry, key, player):
+	if Mcts_tree is None or Mcts_tree[0] != geometry: return None
+	nodes = [Mcts_tree[1]]
+	for ply in range(REUSE_PLIES + 1):
+		for node in nodes:
+			if node.key == key and node.mover != player and node.result is None: return node
+		nodes = [child for node in nodes for child in node.children]
+	return None
+
+
+# Drop the kept tree
+def reset_tree():
+	global Mcts_tree
+	Mcts_tree = None
+
+
+# Play a random game from the board with player to move. Return the winner (the player to move or its opponent), 0 for a draw.
+def playout(board, player, rng):
+	pts = [int(pt) for pt in board.gen_legal_moves()]
+	rng.shuffle(pts)
+	opponent = board.x_player + board.o_player - player
+	winner, played = 0, 0
+	for pt in pts:
+		board.play_move(player, pt)
+		played += 1
+		if board.wins_at(pt):
+			winner = player
+			break
+		player, opponent = opponent, player
+	for pt in pts[:played]: board.undo_move(pt)
+	return winner
+
+
+# Run one iteration from the root: select a path with UCT, expand a node, play out and back up the reward
+def iterate(board, root, rng):
+	node, path = root, []
+	# Selection
+	while not node.untried and node.children:
+		node = node.select_child()
+		board.play_move(node.mover, node.pt)
+		path.append(node.pt)
+
+	# Expansion
+	if node.result is None and node.untried:
+		pt = node.untried.pop(rng.randrange(len(node.untried)))
+		mover = board.x_player + board.o_player - node.mover
+		board.play_move(mover, pt)
+		path.append(pt)
+		if board.wins_at(pt): result = 1
+		elif board.is_full(): result = 0.5
+		else: result = None
+		child = MCTSNode(board, pt, mover, node, result)
+		node.children.append(child)
+		node = child
+
+	# Playout: the reward of the game for the mover of the node
+	if node.result is not None: reward = node.result
+	else:
+		winner = playout(board, board.x_player + board.o_player - node.mover, rng)
+		reward = 0.5 if winner == 0 else (1.0 if winner == node.mover else 0.0)
+
+	# Backup: the reward alternates between the movers up the path
+	while node is not None:
+		node.visits += 1
+		node.value += reward
+		reward = 1 - reward
+		node = node.parent
+	for pt in reversed(path): board.undo_move(pt)
+
+
+# Grow the tree of the position for player to move, reusing the kept tree. Stop after iterations or time_ms milliseconds.
+# Return the root node.
+def grow_tree(board, player, iterations=None, time_ms=None, rng=random):
+	global Mcts_tree
+	if iterations is None and time_ms is None: iterations = DEFAULT_MCTS_ITERATIONS
+	root = find_subtree(board.geometry, board.key, player)
+	if root is None: root = MCTSNode(board, None, board.x_player + board.o_player - player, None)
+	root.parent = None
+	Mcts_tree = (board.geometry, root)
+	deadline = None if time_ms is None else time.perf_counter() + time_ms / 1000
+	count = 0
+	while iterations is None or count < iterations:
+		if deadline is not None and count % CLOCK_INTERVAL == 0 and time.perf_counter() > deadline: break
+		iterate(board, root, rng)
+		count += 1
+	return root
+
+
+# Grow a tree in a worker process. A task is (backend, geometry, stones, player, iterations, time_ms, seed).
+# Return the root moves as a list of (pt, visits) with the visits of this search only: a reused tree may be shared by
+# several workers (they start as copies of the main process), its visits would be counted more than once.
+def mcts_task(task):
+	backend, geometry, stones, player, iterations, time_ms, seed = task
+	board = worker_board(backend, geometry, stones)
+	reused = find_subtree(board.geometry, board.key, player)
+	before = {} if reused is None else {child.pt: child.visits for child in reused.children}
+	root = grow_tree(board, player, iterations, time_ms, random.Random(seed))
+	return [(child.pt, child.visits - before.get(child.pt, 0)) for child in root.children]
+
+
+# Search the legal moves of player with MCTS. Return the moves and their visit counts, so the best move (the most visited,
+# the most robust choice) has the highest value like in search.get_legal_move_outcomes.
+# With more than one process the iterations are shared by the worker processes and the counts are added up.
+def mcts_move_outcomes(board, player, iterations=None, time_ms=None, processes=None, rng=random):
+	pts = [int(pt) for pt in board.gen_legal_moves()]
+	visits = dict.fromkeys(pts, 0)
+	if processes is not None and processes > 1:
+		if iterations is None and time_ms is None: iterations = DEFAULT_MCTS_ITERATIONS
+		shares = [None if iterations is None else iterations // processes + (worker < iterations % processes) for worker in range(processes)]
+		tasks = [(board_backend(board), board.geometry, board_stones(board), player, share, time_ms, rng.getrandbits(64)) for share in shares]
+		for moves in get_search_pool(processes).map(mcts_task, tasks):
+			for pt, count in moves: visits[pt] += count
+	else:
+		for child in grow_tree(board, player, iterations, time_ms, rng).children: visits[child.pt] = child.visits
+	return pts, [visits[pt] for pt in pts]
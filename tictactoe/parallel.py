@@ -0,0 +1,120 @@
+# Parallel root search: the moves at the root are split across a pool of worker processes.
+# Every worker keeps its own transposition table between searches. The entries a worker stores close to the root during a task
+# are sent back and merged into the table of the main process, so later searches there (and the next iteration of iterative deepening) use them.
+# Without exact values the first move is searched in the main process and the other moves in parallel with the window it sets
+# (young brothers wait at the root), so they are pruned as much as the serial search prunes them.
+import time
+from multiprocessing import Pool
+from . import search
+from .board import BOARD_BACKENDS, new_board
+
+# Entries of the worker tables at most this many moves below the searched move are merged into the main table
+MERGE_PLIES = 3
+
+# Process pool of the parallel searches and its number of processes, created on first use
+Search_pool = None
+Search_pool_size = 0
+
+# Boards of a worker process, one per (backend, geometry)
+Worker_boards = {}
+
+
+# Return the process pool for parallel searches, (re)creating it for a different number of processes
+def get_search_pool(processes):
+	global Search_pool, Search_pool_size
+	if Search_pool is None or Search_pool_size != processes:
+		close_search_pool()
+		Search_pool, Search_pool_size = Pool(processes), processes
+	return Search_pool
+
+
+# Shut down the process pool of the parallel searches
+def close_search_pool():
+	global Search_pool, Search_pool_size
+	if Search_pool is not None:
+		Search_pool.terminate()
+		Search_pool.join()
+	Search_pool, Search_pool_size = None, 0
+
+
+# Return the name of the backend of board in BOARD_BACKENDS
+def board_backend(board):
+	return next(name for name, cls in BOARD_BACKENDS.items() if type(board) is cls)
+
+
+# Return the stones on board as a list of (point, player) pairs, which is all a worker process needs to set up the position
+def board_stones(board):
+	return [(pt, board.get_color(pt)) for pt in range(board.rows * board.cols) if board.get_color(pt) != board.empty]
+
+
+# Return the board of the worker process for the backend and geometry, set up with the stones
+def worker_board(backend, geometry, stones):
+	board = Worker_boards.get((backend, geometry))
+	if board is None:
+		rows, cols, k = geometry
+		board = Worker_boards[(backend, geometry)] = new_board(cols, rows, k, backend)
+	board.clear()
+	for stone, color in stones: board.play_move(color, stone)
+	return board
+
+
+# Search the move pt for player in the worker process. A task holds everything the worker needs to set up the position:
+# (backend, geometry, stones, player, pt, alpha, beta, depth, limits) where stones lists the (point, player) pairs on the board
+# and limits is None or the (seconds, nodes) left of the budget. Return the value of the move for player, the number of nodes
+# searched and the transposition table entries to merge.
+def search_task(task):
+	backend, geometry, stones, player, pt, alpha, beta, depth, limits = task
+	board = worker_board(backend, geometry, stones)
+	opponent = board.x_player + board.o_player - player
+	nodes = search.get_search_nodes()
+	search.Transposition_table.log = {}
+	if limits is not None:
+		seconds, node_limit = limits
+		search.Search_limits = (None if seconds is None else time.perf_counter() + seconds, None if node_limit is None else nodes + node_limit)
+	try:
+		board.play_move(player, pt)
+		if board.wins_at(pt): val = 1
+		else: val = -search.negamax(board, opponent, -beta, -alpha, None if depth is None else depth - 1)
+	finally:
+		search.Search_limits = None
+		stored, search.Transposition_table.log = search.Transposition_table.log, None
+	# Entries of this task only, for positions at most MERGE_PLIES below the searched one: their search depth goes down by one a ply
+	top_depth = board.empty_count if depth is None else min(depth - 1, board.empty_count)
+	entries = [entry for entry in stored.values() if top_depth - MERGE_PLIES <= entry[3] <= top_depth]
+	return val, search.get_search_nodes() - nodes, entries
+
+
+# Compute the minimax values of the moves pts for a player like search.search_move_outcomes, with the moves split across
+# a pool of the given number of processes. A budget set by the running iterative deepening search is shared by the workers.
+def parallel_move_outcomes(board, player, pts, exact, depth, processes):
+	backend, stones = board_backend(board), board_stones(board)
+	classes = search.symmetric_move_classes(board, pts)
+	representatives = [int(representative) for representative, moves in classes]
+
+	# Without exact values, search the first move here to get a window for the others
+	best_val, class_vals = -1, {}
+	if not exact and representatives:
+		first = representatives.pop(0)
+		class_vals[first] = best_val = search.search_move_outcomes(board, player, [first], True, depth)[1][0]
+
+	# Share what is left of the budget between the tasks
+	limits = None
+	if search.Search_limits is not None and representatives:
+		deadline, node_limit = search.Search_limits
+		seconds = None if deadline is None else max(0, deadline - time.perf_counter())
+		nodes = None if node_limit is None else max(1, (node_limit - search.get_search_nodes()) // len(representatives))
+		limits = (seconds, nodes)
+
+	alpha = -1 if exact else best_val - search.TIE_MARGIN
+	tasks = [(backend, board.geometry, stones, player, pt, alpha, 1, depth, limits) for pt in representatives]
+	results = get_search_pool(processes).map(search_task, tasks, chunksize=1) if tasks else []
+
+	# Merge the worker results into this process
+	for pt, (val, nodes, entries) in zip(representatives, results):
+		class_vals[pt] = val
+		search.add_search_nodes(nodes)
+		for key, val, flag, entry_depth, best in entries: search.Transposition_table.store(key, val, flag, entry_depth, best)
+	vals_by_pt = {}
+	for representative, moves in classes:
+		for pt in moves: vals_by_pt[pt] = class_vals[int(representative)]
+	return pts, [vals_by_pt[pt] for pt in pts]
@@ -0,0 +1,168 @@
+# Quiet protocol mode for scripted clients: every command gets one terse reply, '= ...' on success or '? error' on an error,
+# followed by an empty line. Nothing else is written: no board rendering, no ANSI colors, no menus or banners and no prompts.
+# A finished game is only reported by result; r starts a new one. The server (server.py) speaks the same protocol.
+# Every session has its own random number generator for genr, the tie-break of gen and the MCTS playouts, seed [n] makes it
+# (and so the session) repeatable.
+# Commands: play [x/o] [a2], gen [x/o] [time/nodes n], gen [x/o] mcts [n/time n], genr [x/o], result, r, show,
+# size [n] [k] / size [rows] [cols] [k], seed [n], q
+import random
+from .board import MAX_BOARD_SIZE, int_to_player, player_to_int, move_to_string, string_to_move
+from .mcts import mcts_move_outcomes
+from .search import get_legal_move_outcomes
+
+# Time budget (milliseconds) of gen on boards larger than 3 x 3 when the command sets no budget
+DEFAULT_GEN_TIME_MS = 2000
+# Budget options of the gen command
+GEN_BUDGETS = ('time', 'nodes')
+# Seeds chosen by seed without a number have this many bits
+SEED_BITS = 32
+
+
+# ProtocolError is raised for a command that can not be executed, its message is the '? ' reply
+class ProtocolError(Exception):
+	pass
+
+
+# Return the result of the game on the board: x or o if they won, draw if the board is full, else unknown as the game is still going on
+def game_result(board):
+	# Check if x won
+	if board.is_winner(board.x_player): return "x"
+	# Check if o won
+	if board.is_winner(board.o_player): return "o"
+	# Check for a draw
+	if board.is_full(): return "draw"
+	return "unknown"
+
+
+# Return the player of a play, gen or genr command. The game must still be going on.
+def command_player(cmd_args, board):
+	if len(cmd_args) == 0 or cmd_args[0] not in ['x', 'o']: raise ProtocolError("Invalid Player [Valid Players:'x' or 'o']")
+	if game_result(board) != 'unknown': raise ProtocolError("Game over")
+	return player_to_int(cmd_args[0])
+
+
+# Return the options of a gen command: the engine ('negamax' or 'mcts') and the search budget as the time_ms, nodes or
+# iterations (mcts) arguments of the engine. Forms: gen x, gen x time/nodes n, gen x mcts, gen x mcts n (iterations) and
+# gen x mcts time n. Negamax gets a default time budget on boards larger than 3 x 3, they are too big to solve every time.
+def gen_options(cmd_args, board):
+	options = cmd_args[1:]
+	engine = 'negamax'
+	if options and options[0] == 'mcts':
+		engine, options = 'mcts', options[1:]
+		if len(options) == 1: options = ['iterations'] + options
+	if len(options) not in (0, 2): raise ProtocolError("Invalid number of Arguments for the Gen Command")
+	if len(options) == 2:
+		if options[0] not in (GEN_BUDGETS if engine == 'negamax' else ('time', 'iterations')):
+			raise ProtocolError("Invalid Budget [Valid Budgets:'time' or 'nodes', 'mcts [n]' or 'mcts time [n]']")
+		if not options[1].isdigit() or int(options[1]) == 0: raise ProtocolError("Invalid Budget Amount (Must be a positive integer)")
+		return engine, {('time_ms' if options[0] == 'time' else options[0]): int(options[1])}
+	if engine == 'negamax' and board.rows * board.cols > 9: return engine, {'time_ms': DEFAULT_GEN_TIME_MS}
+	return engine, {}
+
+
+# Compute the values of the legal moves of player with the engine of a gen command (see gen_options). The best moves have the
+# highest value: negamax values after a threat search, or visit counts for mcts (its playouts draw from rng).
+def gen_move_outcomes(board, player, engine, budget, processes=None, verbose=False, rng=random):
+	if engine == 'mcts': return mcts_move_outcomes(board, player, processes=processes, rng=rng, **budget)
+	return get_legal_move_outcomes(board, player, threat_check=True, verbose=verbose, processes=processes, **budget)
+
+
+# Return the best moves of player on board with the engine of a gen command
+def best_moves(board, player, engine, budget, processes=None, rng=random):
+	pts, vals = gen_move_outcomes(board, player, engine, budget, processes, rng=rng)
+	best_val = max(vals)
+	return [int(pt) for pt, val in zip(pts, vals) if val == best_val]
+
+
+# Return the board as text without colors: a row of x, o and . per line
+def board_text(board):
+	rows, cols = board.get_dimensions()
+	return "\n".join("".join(int_to_player(board.get_color(board.get_pt(1 + row, col))) for col in range(cols)) for row in range(rows))
+
+
+# Execute a command on the board. Return the reply ('= ...' or '? ...', None for an empty line) and whether the session ends.
+# Parameter processes is the number of processes of the gen search (see search.get_legal_move_outcomes) and rng the random
+# number generator of the session (a random.Random).
+def protocol_command(cmd_string, board, processes=None, rng=random):
+	cmd_list = cmd_string.lower().split()
+	if len(cmd_list) == 0: return None, False
+	cmd_name, cmd_args = cmd_list[0], cmd_list[1:]
+	try:
+		if cmd_name == 'q': return '= ', True
+		if cmd_name == 'gen':
+			player = command_player(cmd_args, board)
+			pt = rng.choice(best_moves(board, player, *gen_options(cmd_args, board), processes=processes, rng=rng))
+			board.play_move(player, pt)
+			return '= ' + move_to_string(board.get_coord(pt)), False
+		return '= ' + board_command(cmd_name, cmd_args, board, rng), False
+	except ProtocolError as error:
+		return '? ' + str(error), False
+
+
+# Execute a command other than gen and q on the board, drawing random moves from rng. Return the text of the reply.
+def board_command(cmd_name, cmd_args, board, rng=random):
+	if cmd_name == 'play':
+		player = command_player(cmd_args, board)
+		if len(cmd_args) != 2: raise ProtocolError("Invalid number of Arguments for the Play Command")
+		move = string_to_move(cmd_args[1], board)
+		if move == -1: raise ProtocolError("Invalid Move Location for the Play Command")
+		pt = board.get_pt(move[0], move[1])
+		if board.get_color(pt) != board.empty: raise ProtocolError("Invalid Move Location (Move is currently occupied)")
+		board.play_move(player, pt)
+		return ''
+
+	elif cmd_name == 'genr':
+		player = command_player(cmd_args, board)
+		if len(cmd_args) != 1: raise ProtocolError("Invalid number of Arguments for the Genr Command")
+		pt = int(rng.choice(board.gen_legal_moves()))
+		board.play_move(player, pt)
+		return move_to_string(board.get_coord(pt))
+
+	elif cmd_name == 'result':
+		if len(cmd_args) != 0: raise ProtocolError("Invalid number of Arguments for the Result Command")
+		return game_result(board)
+
+	elif cmd_name == 'r':
+		if len(cmd_args) != 0: raise ProtocolError("Invalid number of Arguments for the Reset Command")
+		board.reset()
+		return ''
+
+	elif cmd_name == 'show':
+		if len(cmd_args) != 0: raise ProtocolError("Invalid number of Arguments for the Show Command")
+		return '\n' + board_text(board)
+
+	elif cmd_name == 'size':
+		if not 1 <= len(cmd_args) <= 3 or not all(arg.isdigit() for arg in cmd_args): raise ProtocolError("Invalid Arguments for the Size Command")
+		numbers = [int(arg) for arg in cmd_args]
+		if len(numbers) == 3: rows, cols, k = numbers
+		else: rows, cols, k = numbers[0], numbers[0], numbers[-1]
+		if not (1 <= rows <= MAX_BOARD_SIZE and 1 <= cols <= MAX_BOARD_SIZE): raise ProtocolError("Invalid Board Size")
+		if not 1 <= k <= max(rows, cols): raise ProtocolError("Invalid Win Length")
+		board.set_geometry(rows, cols, k)
+		return ''
+
+	elif cmd_name == 'seed':
+		return str(seed_command(cmd_args, rng))
+
+	raise ProtocolError("Unknown command")
+
+
+# Seed the random number generator rng with the number of a seed command, or with a new random seed if it has none.
+# Return the seed, which replays the session from this point.
+def seed_command(cmd_args, rng):
+	if len(cmd_args) > 1 or not all(arg.isdigit() for arg in cmd_args): raise ProtocolError("Invalid Arguments for the Seed Command")
+	seed = int(cmd_args[0]) if cmd_args else random.SystemRandom().getrandbits(SEED_BITS)
+	rng.seed(seed)
+	return seed
+
+
+# Read commands from the input file line by line and write the replies to the output file, until q or the end of the input.
+# The session draws its random moves from a generator seeded with seed (None seeds it from the operating system).
+def serve_lines(board, input_file, output_file, processes=None, seed=None):
+	rng = random.Random(seed)
+	for line in input_file:
+		reply, done = protocol_command(line, board, processes, rng)
+		if reply is not None:
+			output_file.write(reply + '\n\n')
+			output_file.flush()
+		if done: break
@@ -0,0 +1,227 @@
+# Compact binary game records: one small record per game (geometry, strategies, seed, result and the moves as point indices).
+# Files are written as a stream by RecordWriter and read back one game at a time by read_records, so a file of millions of
+# games is never held in memory. The text logs of "Game Results" (game_log files and the tournament log) convert to records.
+#
+# File format: the 4 byte magic b'TTTR', then a sequence of entries that each start with a tag byte:
+#   NAME_TAG: name id (byte), name length (byte), name (utf-8)  - defines a strategy name before the first game that uses it
+#   GAME_TAG: GAME_HEADER (rows, cols, k, result, x name id, o name id, flags, seed, number of moves), then the moves as one
+#             byte per move (two bytes on boards of more than 256 points). Bit 0 of flags is set if the game has a seed.
+import os
+import re
+import struct
+from collections import namedtuple
+from .board import new_board, string_to_move
+
+RECORD_FILE_MAGIC = b'TTTR'
+NAME_TAG = b'N'
+GAME_TAG = b'G'
+GAME_HEADER = struct.Struct('<BBBBBBBQH')
+HAS_SEED = 1
+# Game results: player x wins, player o wins or draw (also used by match.py)
+X_WINS, O_WINS, DRAW = 1, 2, 3
+
+# One game: geometry (rows, cols, k), the strategy names of x and o (None if unknown), the seed (None if unknown),
+# the moves as point indices (x moves first) and the result (X_WINS/O_WINS/DRAW)
+GameRecord = namedtuple('GameRecord', ['geometry', 'x_strategy', 'o_strategy', 'seed', 'moves', 'result'])
+
+# A blunder found by analyze: the ply of the move (from 0), the player, the move and the value of the position for the player
+# before the move (the best value) and after it (the value of the move), -1 loss, 0 draw, 1 win
+Blunder = namedtuple('Blunder', ['ply', 'player', 'move', 'best_value', 'value'])
+
+
+# Return the struct format of count moves on a board of points points
+def moves_format(points, count):
+	return '<{}{}'.format(count, 'B' if points <= 256 else 'H')
+
+
+# RecordWriter writes game records to a file as they come. Use it as a context manager or call close().
+class RecordWriter:
+	def __init__(self, filename, append=False):
+		self.names = {None: 0}
+		exists = append and os.path.exists(filename) and os.path.getsize(filename) > 0
+		if exists:
+			# Names already defined in the file keep their ids
+			with open(filename, 'rb') as f: self.names.update(read_names(f))
+		self.file = open(filename, 'ab' if exists else 'wb')
+		if not exists: self.file.write(RECORD_FILE_MAGIC)
+
+	# Return the id of a strategy name, defining it in the file on first use
+	def name_id(self, name):
+		if name not in self.names:
+			if len(self.names) > 255: raise ValueError("Too many strategy names in one record file")
+			data = name.encode()
+			self.names[name] = len(self.names)
+			self.file.write(NAME_TAG + bytes([self.names[name], len(data)]) + data)
+		return self.names[name]
+
+	# Append a GameRecord
+	def write(self, record):
+		rows, cols, k = record.geometry
+		x_id, o_id = self.name_id(record.x_strategy), self.name_id(record.o_strategy)
+		flags = 0 if record.seed is None else HAS_SEED
+		self.file.write(GAME_TAG + GAME_HEADER.pack(rows, cols, k, record.result, x_id, o_id, flags, record.seed or 0, len(record.moves)))
+		self.file.write(struct.pack(moves_format(rows * cols, len(record.moves)), *record.moves))
+
+	def flush(self):
+		self.file.flush()
+
+	def close(self):
+		self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+
+# Read the entries of an open record file (positioned after the magic) one at a time.
+# Yield ('name', id, name) for a name definition and ('game', GameRecord with name ids) for a game.
+def read_entries(f):
+	while True:
+		tag = f.read(1)
+		if not tag: return
+		if tag == NAME_TAG:
+			name_id, length = f.read(2)
+			yield 'name', name_id, f.read(length).decode()
+		elif tag == GAME_TAG:
+			data = f.read(GAME_HEADER.size)
+			if len(data) < GAME_HEADER.size: raise ValueError("Truncated game record")
+			rows, cols, k, result, x_id, o_id, flags, seed, count = GAME_HEADER.unpack(data)
+			form = moves_format(rows * cols, count)
+			data = f.read(struct.calcsize(form))
+			if len(data) < struct.calcsize(form): raise ValueError("Truncated game record")
+			yield 'game', GameRecord((rows, cols, k), x_id, o_id, seed if flags & HAS_SEED else None, struct.unpack(form, data), result)
+		else: raise ValueError("Invalid record tag: " + repr(tag))
+
+
+# Return the strategy names defined in an open record file as {name: id}
+def read_names(f):
+	if f.read(len(RECORD_FILE_MAGIC)) != RECORD_FILE_MAGIC: raise ValueError("Not a game record file")
+	return {entry[2]: entry[1] for entry in read_entries(f) if entry[0] == 'name'}
+
+
+# Generator of the GameRecords of a record file, in the order they were written
+def read_records(filename):
+	with open(filename, 'rb') as f:
+		if f.read(len(RECORD_FILE_MAGIC)) != RECORD_FILE_MAGIC: raise ValueError("Not a game record file: " + filename)
+		names = {0: None}
+		for entry in read_entries(f):
+			if entry[0] == 'name': names[entry[1]] = entry[2]
+			else:
+				record = entry[1]
+				yield record._replace(x_strategy=names[record.x_strategy], o_strategy=names[record.o_strategy])
+
+
+# Generator of the GameRecords of a text log: a game_log file of run_match ("GAME #1:", "Player x: b1", "Result: ...")
+# or a tournament log of run_tournament ("x o game seed result moves"). The strategies of a game_log file are taken from
+# its name (game_log_weak_vs_strong.txt) if they are not given.
+def read_text_log(filename, x_strategy=None, o_strategy=None, geometry=(3, 3, 3)):
+	from .match import STRATEGIES
+	labels = {label: name for name, (function, label, description) in STRATEGIES.items()}
+	match = re.match(r'game_log_(\w+?)_vs_(\w+)\.txt$', os.path.basename(filename))
+	if match:
+		x_strategy = x_strategy or labels.get(match.group(1))
+		o_strategy = o_strategy or labels.get(match.group(2))
+	rows, cols, k = geometry
+	board = new_board(cols, rows, k, 'bitboard')
+	results = {'Result: Player x wins': X_WINS, 'Result: Player o wins': O_WINS, 'Result: Draw': DRAW, 'x': X_WINS, 'o': O_WINS, 'd': DRAW}
+
+	# Return the point of a move string
+	def point(move):
+		row, col = string_to_move(move, board)
+		return board.get_pt(row, col)
+
+	moves = None
+	with open(filename) as f:
+		for line in f:
+			line = line.strip()
+			if not line or line.startswith('#'): continue
+			if line.startswith('GAME #'): moves = []
+			elif line.startswith('Player ') and moves is not None and ': ' in line:
+				moves.append(point(line.split(': ')[1]))
+			elif line in results and moves is not None:
+				yield GameRecord(geometry, x_strategy, o_strategy, None, tuple(moves), results[line])
+				moves = None
+			elif moves is None and len(line.split()) >= 5 and line.split()[4] in ('x', 'o', 'd'):
+				fields = line.split()
+				yield GameRecord(geometry, fields[0], fields[1], int(fields[3]), tuple(point(move) for move in fields[5:]), results[fields[4]])
+
+
+# Replay the games through the solver and yield (record, blunders) for every game, where blunders lists a Blunder for every
+# move that lowers the value of the game for its player (a win thrown to a draw or a loss, or a draw to a loss). Positions are
+# looked up in a cache of their best value and best moves, so common openings are solved once. Games are read one at a time
+# from the iterable records.
+def analyze(records, backend='bitboard', cache_size=1 << 20):
+	from .search import get_legal_move_outcomes
+	boards, cache = {}, {}
+	for record in records:
+		rows, cols, k = record.geometry
+		board = boards.get(record.geometry)
+		if board is None: board = boards[record.geometry] = new_board(cols, rows, k, backend)
+		board.reset()
+		player = board.x_player
+		blunders = []
+		for ply, pt in enumerate(record.moves):
+			key = (record.geometry, board.key, player)
+			solved = cache.get(key)
+			if solved is None:
+				pts, vals = get_legal_move_outcomes(board, player, threat_check=False)
+				best_val = max(vals)
+				solved = (best_val, frozenset(int(move) for move, val in zip(pts, vals) if val == best_val))
+				if len(cache) >= cache_size: cache.clear()
+				cache[key] = solved
+			best_val, best_pts = solved
+			if pt not in best_pts:
+				board.play_move(player, pt)
+				if board.wins_at(pt): val = 1
+				else: val = -max(get_legal_move_outcomes(board, board.x_player + board.o_player - player, threat_check=False)[1])
+				board.undo_move(pt)
+				blunders.append(Blunder(ply, player, pt, best_val, val))
+			board.play_move(player, pt)
+			if board.wins_at(pt): break
+			player = board.x_player + board.o_player - player
+		yield record, blunders
+
+
+# Command line: python3 -m tictactoe.records convert LOG... --output FILE   (text logs to a record file)
+#               python3 -m tictactoe.records analyze FILE [--backend NAME]   (list the blunders of the games)
+#               python3 -m tictactoe.records show FILE                       (print the games)
+if __name__ == '__main__':
+	import argparse
+	from .board import move_to_string
+	parser = argparse.ArgumentParser(description="Convert, show and analyze game record files")
+	parser.add_argument('command', choices=['convert', 'analyze', 'show'])
+	parser.add_argument('files', nargs='+', help="text logs (convert) or a record file")
+	parser.add_argument('--output', default=None, help="record file written by convert")
+	parser.add_argument('--backend', default='bitboard', help="board backend of analyze")
+	args = parser.parse_args()
+
+	if args.command == 'convert':
+		if args.output is None: parser.error("convert needs --output")
+		count = 0
+		with RecordWriter(args.output) as writer:
+			for filename in args.files:
+				for record in read_text_log(filename):
+					writer.write(record)
+					count += 1
+		print("Converted {} games to {}".format(count, args.output))
+	else:
+		boards = {}
+		# Return the string of a move on a board of the geometry
+		def move_string(geometry, pt):
+			if geometry not in boards: boards[geometry] = new_board(geometry[1], geometry[0], geometry[2], 'bitboard')
+			return move_to_string(boards[geometry].get_coord(pt))
+		for filename in args.files:
+			if args.command == 'show':
+				for game, record in enumerate(read_records(filename), 1):
+					print("{} {} {} {} {} {}".format(game, record.x_strategy, record.o_strategy, record.seed, "-xod"[record.result],
+						" ".join(move_string(record.geometry, pt) for pt in record.moves)))
+			else:
+				games = total = 0
+				for games, (record, blunders) in enumerate(analyze(read_records(filename), args.backend), 1):
+					for blunder in blunders:
+						print("game {} ply {}: {} {} ({} -> {})".format(games, blunder.ply, "-xo"[blunder.player],
+							move_string(record.geometry, blunder.move), blunder.best_value, blunder.value))
+					total += len(blunders)
+				print("{} blunders in {} games".format(total, games))
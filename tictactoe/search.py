@@ -0,0 +1,459 @@
+# Negamax search engine: alpha-beta search with a transposition table, move ordering and symmetry reduction.
+import struct
+import time
+from . import solutions
+from .board import Zobrist_player
+from .threats import threat_values
+
+# Transposition table entry types: exact minimax value, lower bound (fail high) and upper bound (fail low)
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+# Transposition table file format: magic header and one record per entry (key, value, flag, depth, best move).
+# The depth takes two bytes, boards of up to 25 x 25 have more than 255 empty points.
+TT_FILE_MAGIC = b'TTT2'
+TT_RECORD = struct.Struct('<QbBHh')
+# Killer moves per depth (number of empty points left) and cached static move rankings per board geometry
+Killer_moves = {}
+Move_ranks = {}
+# Number of nodes visited by negamax
+search_nodes = 0
+# Budget of the running iterative deepening search: (deadline in seconds, node limit), either may be None. None when there is no budget.
+Search_limits = None
+# Statistics of the search (a stats.SearchStats object), None when they are off. See stats.py.
+Search_stats = None
+# Root moves tie with the best move if their value is within this margin of it
+TIE_MARGIN = 1e-6
+# Exact move values of the positions analyzed without a budget (the tutor): (geometry, key, player) -> (moves, values).
+# Cleared when it holds EXACT_OUTCOMES_SIZE positions.
+Exact_outcomes = {}
+EXACT_OUTCOMES_SIZE = 1 << 12
+
+
+# SearchTimeout is raised inside negamax when the budget of an iterative deepening search runs out.
+class SearchTimeout(Exception):
+	pass
+
+
+# TranspositionTable Class stores the results of negamax searches so that positions reached again are not searched twice.
+# Entries are (key, val, flag, depth, best) tuples where depth is the number of empty points below the position that were searched.
+# The table has a fixed number of slots (a power of two) indexed by the low bits of the key. When two positions share a slot the
+# replacement policy decides which one is kept:
+#   'depth'    - Depth preferred: keep the entry with the deeper search (the more expensive one to recompute)
+#   'two-tier' - Every slot has a depth preferred entry and an always replace entry
+class TranspositionTable:
+	def __init__(self, max_entries=1 << 18, policy='depth'):
+		if policy not in ('depth', 'two-tier'): raise ValueError("Invalid replacement policy: " + str(policy))
+		# Round the size cap down to a power of two so a slot is found with a bit mask
+		self.num_slots = 1 << max(0, int(max_entries).bit_length() - 1)
+		if policy == 'two-tier': self.num_slots = max(1, self.num_slots // 2)
+		self.mask = self.num_slots - 1
+		self.policy = policy
+		# Store log: None, or a dictionary that receives every stored entry by key (see parallel.search_task)
+		self.log = None
+		self.clear()
+
+	# Remove all entries and reset the counters
+	def clear(self):
+		self.deep = [None] * self.num_slots
+		self.recent = [None] * self.num_slots if self.policy == 'two-tier' else None
+		self.reset_counters()
+
+	# Reset the hit/miss/collision counters
+	def reset_counters(self):
+		self.hits = 0
+		self.misses = 0
+		self.collisions = 0
+		self.stores = 0
+
+	# Return the entry stored for a key, or None if the key is not in the table
+	def probe(self, key):
+		slot = key & self.mask
+		entry = self.deep[slot]
+		if entry is not None and entry[0] == key:
+			self.hits += 1
+			return entry
+		if self.recent is not None:
+			recent = self.recent[slot]
+			if recent is not None and recent[0] == key:
+				self.hits += 1
+				return recent
+			if recent is not None: entry = recent
+		# A different position occupies the slot
+		if entry is not None: self.collisions += 1
+		self.misses += 1
+		return None
+
+	# Store the result of a search, following the replacement policy
+	def store(self, key, val, flag, depth, best):
+		slot = key & self.mask
+		entry = (key, val, flag, depth, best)
+		self.stores += 1
+		if self.log is not None: self.log[key] = entry
+		current = self.deep[slot]
+		if current is None or current[0] == key or depth >= current[3]:
+			# Two-tier: the entry pushed out of the depth preferred tier moves down to the always replace tier
+			if self.recent is not None and current is not None and current[0] != key: self.recent[slot] = current
+			self.deep[slot] = entry
+		elif self.recent is not None:
+			self.recent[slot] = entry
+
+	# Return all stored entries
+	def entries(self):
+		tiers = [self.deep] if self.recent is None else [self.deep, self.recent]
+		return [entry for tier in tiers for entry in tier if entry is not None]
+
+	# Return the number of stored entries
+	def __len__(self):
+		return len(self.entries())
+
+	# Save the table to a compact binary file: a 4 byte header then a fixed size record per entry.
+	# Heuristic values of depth-limited searches (floats) are not saved, only game results (the integers -1, 0, 1).
+	def save(self, filename):
+		with open(filename, 'wb') as f:
+			f.write(TT_FILE_MAGIC)
+			for key, val, flag, depth, best in self.entries():
+				if isinstance(val, float): continue
+				f.write(TT_RECORD.pack(key, int(val), flag, depth, -1 if best is None else best))
+
+	# Load the entries saved by save() into the table. Return the number of entries read.
+	def load(self, filename):
+		with open(filename, 'rb') as f:
+			data = f.read()
+		if data[:len(TT_FILE_MAGIC)] != TT_FILE_MAGIC: raise ValueError("Not a transposition table file: " + filename)
+		if (len(data) - len(TT_FILE_MAGIC)) % TT_RECORD.size: raise ValueError("Truncated transposition table file: " + filename)
+		count = 0
+		for key, val, flag, depth, best in TT_RECORD.iter_unpack(data[len(TT_FILE_MAGIC):]):
+			self.store(key, val, flag, depth, None if best < 0 else best)
+			count += 1
+		return count
+
+
+# Transposition table shared by all negamax searches
+Transposition_table = TranspositionTable()
+
+
+# Compute the minimax values for a player for all legal moves. Parameter threat_check is a flag to run the threat search first (see
+# threats.py): the moves it decides are not searched, and without exact values only its winning moves are returned when it finds one.
+# Parameter exact is a flag to compute the exact value of every move (Tutor), otherwise only the best moves are guaranteed to have exact values.
+# Parameter verbose is a flag to print a message before a search (the interactive CLI sets it).
+# Parameters time_ms and nodes set a time (milliseconds) or node budget. With a budget the values come from an iterative deepening
+# search and are heuristic unless the deepest finished iteration reached the end of the game.
+# Parameter processes splits the root moves across that many worker processes (see parallel.py), None or 1 searches in this process.
+def get_legal_move_outcomes(board, player, threat_check, exact=False, verbose=False, time_ms=None, nodes=None, processes=None):
+	args = (board, player, threat_check, exact, verbose, time_ms, nodes, processes)
+	if Search_stats is not None: return Search_stats.measure(compute_move_outcomes, args)
+	return compute_move_outcomes(*args)
+
+
+# Compute the values of the legal moves, see get_legal_move_outcomes.
+def compute_move_outcomes(board, player, threat_check, exact, verbose, time_ms, nodes, processes):
+	solving = time_ms is None and nodes is None
+	cache_key = (board.geometry, board.key, player)
+	if exact and solving and cache_key in Exact_outcomes:
+		pts, vals = Exact_outcomes[cache_key]
+		return list(pts), list(vals)
+	pts = order_moves(board, board.gen_legal_moves())
+	opponent = board.x_player + board.o_player - player
+
+	# If the game has already been won, every move has the same outcome
+	if board.is_winner(opponent): return pts, [-1] * len(pts)
+	elif board.is_winner(player): return pts, [1] * len(pts)
+
+	# Threat search: moves decided by threats are not searched. Without exact values a proven win is played at once.
+	known = threat_values(board, player, pts, all_wins=exact) if threat_check else {}
+	if not exact and 1 in known.values(): return [pt for pt in pts if known.get(pt) == 1], [1] * list(known.values()).count(1)
+	search_pts = [pt for pt in pts if pt not in known]
+	if not search_pts: return pts, [known[pt] for pt in pts]
+
+	# Solved positions are answered from the solution table without any search
+	outcomes = solution_move_outcomes(board, player, search_pts, exact)
+	if outcomes is None:
+		if verbose: print("\nComputing .... It will just take a moment\n")
+		if not solving: return merge_outcomes(pts, known, iterative_deepening(board, player, search_pts, exact, time_ms, nodes, processes)[:2])
+		outcomes = search_move_outcomes(board, player, search_pts, exact, processes=processes)
+	pts, vals = merge_outcomes(pts, known, outcomes)
+	store_move_values(board, player, pts, vals, exact)
+	if exact:
+		if len(Exact_outcomes) >= EXACT_OUTCOMES_SIZE: Exact_outcomes.clear()
+		Exact_outcomes[cache_key] = (tuple(pts), tuple(vals))
+	return pts, vals
+
+
+# Return the moves pts and their values, taken from known ({pt: value}) or else from the outcomes (moves, values) of a search
+def merge_outcomes(pts, known, outcomes):
+	if not known: return outcomes
+	searched = dict(zip(*outcomes))
+	return pts, [known[pt] if pt in known else searched[pt] for pt in pts]
+
+
+# Store the values of a position solved for player and of the positions after its moves in the transposition table as exact
+# results, so later searches through them (the tutor after the next moves, gen) stop there. Without exact values only the best
+# moves have their exact value.
+def store_move_values(board, player, pts, vals, exact):
+	opponent = board.x_player + board.o_player - player
+	best_val = max(vals)
+	store_position_value(board, player, best_val)
+	for pt, val in zip(pts, vals):
+		if val != best_val and not exact: continue
+		board.play_move(player, pt)
+		if not board.wins_at(pt) and not board.is_full(): store_position_value(board, opponent, -val)
+		board.undo_move(pt)
+
+
+# Store the value of the position for player to move in the transposition table as an exact result of a complete search,
+# keeping the best move of the entry that is already there
+def store_position_value(board, player, val):
+	key = board.canonical()[0] ^ Zobrist_player[player]
+	entry = Transposition_table.probe(key)
+	Transposition_table.store(key, val, EXACT, board.empty_count, None if entry is None else entry[4])
+
+
+# Return the value of the position for player to move if the transposition table holds it from a complete search, else None
+def known_position_value(board, player):
+	entry = Transposition_table.probe(board.canonical()[0] ^ Zobrist_player[player])
+	if entry is None or entry[2] != EXACT or entry[3] < board.empty_count: return None
+	return entry[1]
+
+
+# Iterative deepening: search the moves pts to depth 1, 2, 3, ... until the time (milliseconds) or node budget runs out or the
+# search reaches the end of the game. Every iteration searches the best moves of the previous one first and reuses the
+# transposition table entries it left behind. Return the moves, their values from the deepest finished iteration and its depth.
+# The first iteration always finishes, so there is a move to play even with a tiny budget.
+def iterative_deepening(board, player, pts, exact=False, time_ms=None, nodes=None, processes=None):
+	global Search_limits
+	deadline = None if time_ms is None else time.perf_counter() + time_ms / 1000
+	node_limit = None if nodes is None else search_nodes + nodes
+	vals, depth = None, 0
+	try:
+		# The moves and values are replaced together only when an iteration finishes, so a timeout keeps the last finished one
+		order = pts
+		for depth in range(1, board.empty_count + 1):
+			if vals is not None:
+				previous = dict(zip(pts, vals))
+				order = sorted(pts, key=lambda pt: -previous[pt])
+			pts, vals = search_move_outcomes(board, player, order, exact, depth, processes)
+			# Stop once the game is decided or the search reached every end of the game
+			if max(vals) in (1, -1) and not exact: break
+			Search_limits = (deadline, node_limit)
+	except SearchTimeout:
+		depth -= 1
+	finally:
+		Search_limits = None
+	return pts, vals, depth
+
+
+# Raise SearchTimeout if the budget of the running iterative deepening search is used up. The clock is read every 256 nodes.
+def check_search_limits():
+	deadline, node_limit = Search_limits
+	if node_limit is not None and search_nodes >= node_limit: raise SearchTimeout()
+	if deadline is not None and search_nodes & 255 == 0 and time.perf_counter() > deadline: raise SearchTimeout()
+
+
+# Heuristic value of a position for player to move, used at the horizon of a depth-limited search. Every win line that only
+# one player has stones on counts for that player, 4**stones for more stones. The value is between -0.5 and 0.5, so it ranks
+# below a proven win (1) and above a proven loss (-1).
+def evaluate(board, player):
+	opponent = board.x_player + board.o_player - player
+	scores = [0, 0, 0]
+	for line in board.win_lines:
+		counts = [0, 0, 0]
+		for pt in line: counts[board.get_color(pt)] += 1
+		if counts[opponent] == 0: scores[player] += 4 ** counts[player] - 1
+		elif counts[player] == 0: scores[opponent] += 4 ** counts[opponent] - 1
+	return 0.5 * (scores[player] - scores[opponent]) / (scores[player] + scores[opponent] + 1)
+
+
+# Compute the minimax values of the moves pts for a player with the negamax algorithm. See get_legal_move_outcomes for exact.
+# With a depth, the search stops depth moves ahead (counting the move at the root) and evaluates the position heuristically.
+# With more than one process, the moves are searched in parallel (see parallel.py).
+def search_move_outcomes(board, player, pts, exact, depth=None, processes=None):
+	if processes is not None and processes > 1:
+		from .parallel import parallel_move_outcomes
+		return parallel_move_outcomes(board, player, pts, exact, depth, processes)
+	opponent = board.x_player + board.o_player - player
+	child_depth = None if depth is None else depth - 1
+
+	# Use Negamax algorithm to find bext move for player to make.
+	# Unless exact values are asked for, a move only has to be searched with a window that tells whether it ties the best move so far.
+	# The values of worse moves are then upper bounds, which is enough to pick a best move.
+	# Moves that are symmetric to each other in the current position have the same value, so only one move of every class is searched.
+	best_val = -1
+	class_vals = {}
+	# Exact values with a known value of the position: no move is better, so the moves after it can be searched with a window
+	# that starts there (every move loses if the position is lost)
+	position_val = known_position_value(board, player) if exact and depth is None else None
+	child_alpha = -1 if position_val is None else -position_val
+	for representative, moves in symmetric_move_classes(board, pts):
+		# Simulate possible children moves to obtain the minimax score
+		board.play_move(player, representative)
+
+		# Obtain the minimax value for the playing at pt. And then undo the move
+		try:
+			if board.wins_at(representative): val = 1
+			elif exact and child_alpha == 1: val = -1
+			elif exact: val = -negamax(board, opponent, child_alpha, 1, child_depth)
+			else: val = -negamax(board, opponent, -1, -(best_val - TIE_MARGIN), child_depth)
+		finally:
+			board.undo_move(representative)
+		best_val = max(best_val, val)
+		for pt in moves: class_vals[pt] = val
+	vals = [class_vals[pt] for pt in pts]
+
+	# Return a list of legal moves and the minimax value for the moves
+	return pts, vals
+
+
+# Compute the minimax values of the moves pts for a player from the solution table of the board geometry.
+# Return None if there is no solution table or the position is not in it. Unless exact values are asked for, only the
+# best moves get their exact value and every other move gets an upper bound.
+def solution_move_outcomes(board, player, pts, exact):
+	table = solutions.get_solution_table(board.geometry)
+	if table is None: return None
+	solution = table.lookup(board, player)
+	if solution is None: return None
+	val, best_moves = solution
+	if not exact: return pts, [val if pt in best_moves else val - 1 for pt in pts]
+
+	# Exact values: look up the position after every move
+	opponent = board.x_player + board.o_player - player
+	vals = []
+	for pt in pts:
+		board.play_move(player, pt)
+		if board.wins_at(pt): val = 1
+		elif board.is_full(): val = 0
+		else:
+			child = table.lookup(board, opponent)
+			val = None if child is None else -child[0]
+		board.undo_move(pt)
+		if val is None: return None
+		vals.append(val)
+	return pts, vals
+
+
+# Group the legal moves into classes of moves that are symmetric to each other in the current position (a rotation or
+# reflection of the board that leaves the position unchanged maps one to the other). On an empty 3x3 board there are 3 classes:
+# the center, the corners and the edges. Return a list of (representative move, moves of the class) pairs, in the order of pts.
+def symmetric_move_classes(board, pts):
+	points = range(board.rows*board.cols)
+	stabilizer = [perm for perm in board.symmetries[1:] if all(board.get_color(perm[pt]) == board.get_color(pt) for pt in points)]
+	classes, seen = [], set()
+	for pt in pts:
+		if pt in seen: continue
+		moves = sorted({pt} | {perm[pt] for perm in stabilizer})
+		seen.update(moves)
+		classes.append((pt, moves))
+	return classes
+
+
+# Order the legal moves so that alpha-beta pruning cuts off as early as possible.
+# Transposition table best move first, then the killer moves for this depth, then the static move ranking.
+def order_moves(board, pts, tt_move=None, killers=()):
+	rank = move_rank(board)
+	def priority(pt):
+		if pt == tt_move: return -2
+		if pt in killers: return -1
+		return rank[pt]
+	return sorted(pts, key=priority)
+
+
+# Static move ranking for a board geometry: points that lie on more win lines come first, ties are broken by the distance
+# to the center. On a 3x3 board this puts the center first, then the corners and then the edges.
+def move_rank(board):
+	if board.geometry not in Move_ranks:
+		rows, cols = board.get_dimensions()
+		def priority(pt):
+			row, col = divmod(pt, cols)
+			return (-len(board.lines_through[pt]), abs(2*row - (rows-1)) + abs(2*col - (cols-1)))
+		rank = [0] * (rows*cols)
+		for index, pt in enumerate(sorted(range(rows*cols), key=priority)): rank[pt] = index
+		Move_ranks[board.geometry] = rank
+	return Move_ranks[board.geometry]
+
+
+# Remember a move that caused a beta cutoff for the given depth (number of empty points left). Keep the two most recent ones.
+def store_killer(depth, pt):
+	killers = Killer_moves.setdefault(depth, [])
+	if pt in killers: return
+	killers.insert(0, pt)
+	del killers[2:]
+
+
+# Negamax algorithm with alpha-beta pruning: Compute the minimax value for player to move.
+# The returned value is exact if it lies strictly inside the (alpha, beta) window, otherwise it is a bound.
+# The board must not have a winner yet: wins are detected right after a move is played by looking at the lines through that move.
+# With a depth, the search stops after depth moves and returns the heuristic value of the position (see evaluate).
+def negamax(board, player, alpha=-1, beta=1, depth=None):
+	global search_nodes
+	search_nodes += 1
+	if Search_limits is not None: check_search_limits()
+	opponent = board.x_player + board.o_player - player
+
+	# Check to make sure their exists at least 1 legal move (the board counts its empty points). If not (Terminal Case: DRAW)
+	empty_points = board.empty_count
+	if Search_stats is not None: Search_stats.visit(empty_points)
+	if empty_points == 0: return 0
+	if depth is not None and depth <= 0: return evaluate(board, player)
+	pts = board.gen_legal_moves()
+	child_depth = None if depth is None else depth - 1
+
+	# Canonical Zobrist key of the board position (the same for all its rotations and reflections), together with the player to move.
+	# Best moves are stored in the transposition table as moves of the canonical position.
+	board_hash_code, symmetry = board.canonical()
+	board_hash_code ^= Zobrist_player[player]
+
+	# Check to see if the current board exists in the transposition table to avoid recomputation.
+	# Exact values are returned directly, bounds narrow the search window. Entries of shallower searches only order the moves.
+	# A search as deep as the number of empty points reaches the end of the game, so its value is not heuristic.
+	alpha_orig = alpha
+	tt_move = None
+	search_depth = empty_points if depth is None else min(depth, empty_points)
+	entry = Transposition_table.probe(board_hash_code)
+	if entry is not None:
+		tt_key, tt_val, tt_flag, tt_depth, tt_move = entry
+		if tt_move is not None: tt_move = board.inverse_symmetries[symmetry][tt_move]
+		if tt_depth >= search_depth:
+			if tt_flag == EXACT: return tt_val
+			elif tt_flag == LOWER_BOUND: alpha = max(alpha, tt_val)
+			else: beta = min(beta, tt_val)
+			if alpha >= beta: return tt_val
+	best_val, best_pt = -2, None
+	for pt in order_moves(board, pts, tt_move, Killer_moves.get(empty_points, ())):
+		board.play_move(player, pt)
+
+		# Obtain the minimax value for the playing at pt (Terminal Condition: the move wins)
+		try:
+			if board.wins_at(pt): val = 1
+			else: val = -negamax(board, opponent, -beta, -alpha, child_depth)
+		finally:
+			board.undo_move(pt)
+
+		# Update the best val if the curren val is greater then the best val
+		if val > best_val: best_val, best_pt = val, pt
+		if best_val > alpha: alpha = best_val
+		# Beta cutoff: the opponent will never allow this position
+		if alpha >= beta:
+			store_killer(empty_points, pt)
+			if Search_stats is not None: Search_stats.cutoff()
+			break
+
+	if best_val <= alpha_orig: flag = UPPER_BOUND
+	elif best_val >= beta: flag = LOWER_BOUND
+	else: flag = EXACT
+	Transposition_table.store(board_hash_code, best_val, flag, search_depth, board.symmetries[symmetry][best_pt])
+	return best_val
+
+
+# Return the number of nodes visited by negamax since the last reset.
+def get_search_nodes():
+	return search_nodes
+
+
+# Add nodes searched elsewhere (by the worker processes of a parallel search) to the negamax node counter.
+def add_search_nodes(nodes):
+	global search_nodes
+	search_nodes += nodes
+
+
+# Reset the negamax node counter.
+def reset_search_nodes():
+	global search_nodes
+	search_nodes = 0
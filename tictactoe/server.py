@@ -0,0 +1,120 @@
+# Line-protocol server: many games at once over a local TCP or Unix socket, one board per connection (session).
+# Sessions speak the quiet protocol of ttt.py --quiet (see protocol.py): a reply per command, '= ...' on success and
+# '? ...' on an error, followed by an empty line. Searches run in a process pool so that a slow gen does not stall the other
+# sessions, and the best moves of every solved position are kept in a cache shared by all sessions. Every session has its own
+# random number generator (see the seed command), and a search gets a seed drawn from it, so a seeded session plays the same
+# moves whichever worker runs its searches and whatever the cache holds.
+import asyncio
+import random
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from .board import BOARD_BACKENDS, new_board, move_to_string
+from .parallel import board_backend, board_stones, worker_board
+from .protocol import ProtocolError, best_moves, command_player, gen_options, protocol_command
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 3550
+# Number of positions the solved-position cache holds before it drops the least recently used ones
+SOLVED_CACHE_SIZE = 1 << 16
+
+
+# Compute the best moves of a position in a worker process. A task is (backend, geometry, stones, player, engine, budget, seed)
+# where stones lists the (point, player) pairs on the board, engine and budget are the options of the gen command and seed
+# seeds the random number generator of the search.
+def best_moves_task(task):
+	backend, geometry, stones, player, engine, budget, seed = task
+	return best_moves(worker_board(backend, geometry, stones), player, engine, budget, rng=random.Random(seed))
+
+
+# State shared by the sessions of a server: the process pool and the solved-position cache
+class GameServer:
+	def __init__(self, backend='bitboard', processes=None):
+		self.backend = backend
+		self.pool = ProcessPoolExecutor(processes)
+		# (geometry, position key, player) -> best moves, least recently used first
+		self.solved = OrderedDict()
+		self.sessions = 0
+
+	# Return the best moves of player on board, from the solved-position cache or from a search in the process pool.
+	# Negamax searches without a budget solve the position, their best moves go into the cache. The seed of the search is
+	# drawn from rng even on a cache hit, so the moves the session draws next do not depend on the cache.
+	async def best_moves(self, board, player, engine, budget, rng):
+		seed = rng.getrandbits(64)
+		cache_key = (board.geometry, board.key, player)
+		solving = engine == 'negamax' and not budget
+		best_pts = self.solved.get(cache_key) if solving else None
+		if best_pts is not None:
+			self.solved.move_to_end(cache_key)
+			return best_pts
+		task = (board_backend(board), board.geometry, board_stones(board), player, engine, budget, seed)
+		best_pts = await asyncio.get_running_loop().run_in_executor(self.pool, best_moves_task, task)
+		if solving:
+			self.solved[cache_key] = best_pts
+			if len(self.solved) > SOLVED_CACHE_SIZE: self.solved.popitem(last=False)
+		return best_pts
+
+	# Serve one connection: read commands line by line and write a reply to each until q or the end of the connection
+	async def session(self, reader, writer):
+		self.sessions += 1
+		board = new_board(3, backend=self.backend)
+		rng = random.Random()
+		try:
+			while True:
+				line = await reader.readline()
+				if not line: break
+				reply, done = await self.command(line.decode(errors='replace'), board, rng)
+				if reply is not None:
+					writer.write(reply.encode() + b'\n\n')
+					await writer.drain()
+				if done: break
+		except ConnectionError:
+			pass
+		finally:
+			self.sessions -= 1
+			writer.close()
+
+	# Execute a command on the board of a session like protocol.protocol_command, with the gen search in the process pool.
+	# Parameter rng is the random number generator of the session. Return the reply (None for an empty line) and whether the session ends.
+	async def command(self, cmd_string, board, rng):
+		cmd_list = cmd_string.lower().split()
+		if len(cmd_list) == 0: return None, False
+		cmd_name, cmd_args = cmd_list[0], cmd_list[1:]
+		if cmd_name != 'gen': return protocol_command(cmd_string, board, rng=rng)
+		try:
+			player = command_player(cmd_args, board)
+			pt = rng.choice(await self.best_moves(board, player, *gen_options(cmd_args, board), rng))
+		except ProtocolError as error:
+			return '? ' + str(error), False
+		board.play_move(player, pt)
+		return '= ' + move_to_string(board.get_coord(pt)), False
+
+	# Stop the process pool
+	def close(self):
+		self.pool.shutdown(cancel_futures=True)
+
+
+# Run a server until it is interrupted: on a Unix socket at path if given, else on TCP host:port
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, backend='bitboard', processes=None):
+	game_server = GameServer(backend, processes)
+	if path is not None: server = await asyncio.start_unix_server(game_server.session, path)
+	else: server = await asyncio.start_server(game_server.session, host, port)
+	try:
+		async with server: await server.serve_forever()
+	finally:
+		game_server.close()
+
+
+# Command line: python3 -m tictactoe.server [--host HOST] [--port PORT] [--unix PATH] [--backend NAME] [--processes N]
+if __name__ == '__main__':
+	import argparse
+	parser = argparse.ArgumentParser(description="Serve TTT games over a local socket")
+	parser.add_argument('--host', default=DEFAULT_HOST, help="TCP host")
+	parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port")
+	parser.add_argument('--unix', default=None, help="serve on this Unix socket path instead of TCP")
+	parser.add_argument('--backend', choices=list(BOARD_BACKENDS), default='bitboard', help="board backend")
+	parser.add_argument('--processes', type=int, default=None, help="search processes (default: one per core)")
+	args = parser.parse_args()
+	try:
+		asyncio.run(serve(args.host, args.port, args.unix, args.backend, args.processes))
+	except KeyboardInterrupt:
+		pass
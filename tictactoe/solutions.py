@@ -0,0 +1,115 @@
+# Solution tables: precomputed values and best moves of every reachable position of a board geometry, stored on disk.
+# NumPy is only imported when a table is opened or built.
+import os
+import struct
+from . import search
+from .board import BitboardTicTacToeBoard
+
+# Solution table files: header (magic, rows, cols, k, number of positions) followed by the sorted canonical keys,
+# the values for x and o to move and the best move masks for x and o to move
+SOLUTION_FILE_MAGIC = b'TTTS'
+SOLUTION_HEADER = struct.Struct('<4sHHHxxI')
+SOLUTIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Solutions')
+# Loaded solution tables per board geometry (None if there is no solution file for the geometry)
+Solution_tables = {}
+
+
+# SolutionTable Class gives read access to a solution file built by build_solution_table: the value and the best moves of every
+# position for both players to move. The arrays are memory mapped, so opening a table costs almost nothing and only the
+# pages that are looked at are read. Positions are keyed by their canonical Zobrist key and best moves are stored as bit
+# masks of moves of the canonical position.
+class SolutionTable:
+	def __init__(self, filename):
+		with open(filename, 'rb') as f:
+			magic, rows, cols, k, count = SOLUTION_HEADER.unpack(f.read(SOLUTION_HEADER.size))
+		if magic != SOLUTION_FILE_MAGIC: raise ValueError("Not a solution table file: " + filename)
+		import numpy as np
+		self.geometry = (rows, cols, k)
+		self.num_points = rows*cols
+		mask_bytes = (self.num_points + 7) // 8
+		offset = SOLUTION_HEADER.size
+		self.keys = np.memmap(filename, dtype='<u8', mode='r', offset=offset, shape=(count,))
+		self.vals = np.memmap(filename, dtype=np.int8, mode='r', offset=offset + 8*count, shape=(count, 2))
+		self.best = np.memmap(filename, dtype=np.uint8, mode='r', offset=offset + 10*count, shape=(count, 2, mask_bytes))
+
+	# Return the number of positions in the table
+	def __len__(self):
+		return len(self.keys)
+
+	# Return the value and the list of best moves for player to move in the board position, or None if the position is not in the table
+	def lookup(self, board, player):
+		key, symmetry = board.canonical()
+		index = int(self.keys.searchsorted(key))
+		if index == len(self.keys) or int(self.keys[index]) != key: return None
+		side = player - 1
+		mask = int.from_bytes(self.best[index, side].tobytes(), 'little')
+		inverse = board.inverse_symmetries[symmetry]
+		return int(self.vals[index, side]), [inverse[pt] for pt in range(self.num_points) if mask >> pt & 1]
+
+	# Vectorized lookup: return the values for the players to move (1 or 2 per position) of the positions with the given canonical
+	# keys, and a mask of the positions that are in the table (the value of any other position is 0).
+	def lookup_keys(self, keys, players):
+		import numpy as np
+		if len(self.keys) == 0: return np.zeros(len(keys), dtype=np.int8), np.zeros(len(keys), dtype=bool)
+		index = np.minimum(self.keys.searchsorted(keys), len(self.keys) - 1)
+		found = self.keys[index] == keys
+		values = np.where(found, self.vals[index, np.asarray(players) - 1], 0).astype(np.int8)
+		return values, found
+
+
+# Return the default solution file name for a board geometry
+def solution_file(geometry):
+	return os.path.join(SOLUTIONS_DIR, "solutions_{}x{}_k{}.bin".format(*geometry))
+
+
+# Return the solution table of a board geometry, opening its file the first time. Return None if it has not been built.
+def get_solution_table(geometry):
+	if geometry not in Solution_tables:
+		filename = solution_file(geometry)
+		Solution_tables[geometry] = SolutionTable(filename) if os.path.exists(filename) else None
+	return Solution_tables[geometry]
+
+
+# Build the solution table of a board geometry: enumerate every position reachable from the empty board (the players' stone
+# counts never differ by more than one and nobody has won yet), solve it for both players to move and write the values and
+# best moves to a solution file. Symmetric positions are stored once. With max_stones only the positions with at most
+# that many stones are stored, which gives an opening book for boards too large to solve completely.
+# Return the number of positions written.
+def build_solution_table(geometry=(3, 3, 3), filename=None, max_stones=None):
+	import numpy as np
+	rows, cols, k = geometry
+	filename = filename or solution_file(geometry)
+	board = BitboardTicTacToeBoard(cols, rows, k)
+	positions = {}
+
+	def visit(x_stones, o_stones):
+		key, symmetry = board.canonical()
+		if key in positions: return
+		# Value and best moves (as a mask of moves of the canonical position) for both players to move
+		solution = []
+		for player in (board.x_player, board.o_player):
+			pts, vals = search.search_move_outcomes(board, player, search.order_moves(board, board.gen_legal_moves()), exact=True)
+			best_val = max(vals)
+			solution += [best_val, sum(1 << board.symmetries[symmetry][pt] for pt, val in zip(pts, vals) if val == best_val)]
+		positions[key] = solution
+		if max_stones is not None and x_stones + o_stones >= max_stones: return
+
+		for pt in board.gen_legal_moves():
+			for player, x_count, o_count in ((board.x_player, x_stones + 1, o_stones), (board.o_player, x_stones, o_stones + 1)):
+				if abs(x_count - o_count) > 1: continue
+				board.play_move(player, pt)
+				if not board.wins_at(pt) and not board.is_full(): visit(x_count, o_count)
+				board.undo_move(pt)
+
+	visit(0, 0)
+	keys = sorted(positions)
+	mask_bytes = (rows*cols + 7) // 8
+	os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+	with open(filename, 'wb') as f:
+		f.write(SOLUTION_HEADER.pack(SOLUTION_FILE_MAGIC, rows, cols, k, len(keys)))
+		f.write(np.array(keys, dtype='<u8').tobytes())
+		f.write(np.array([(positions[key][0], positions[key][2]) for key in keys], dtype=np.int8).tobytes())
+		for key in keys:
+			f.write(positions[key][1].to_bytes(mask_bytes, 'little') + positions[key][3].to_bytes(mask_bytes, 'little'))
+	Solution_tables[geometry] = SolutionTable(filename)
+	return len(keys)
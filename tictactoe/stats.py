@@ -0,0 +1,117 @@
+# Search statistics: nodes, transposition table use, cutoffs, depth, branching and where the time goes, per computed move.
+# Statistics are off by default. enable() installs a SearchStats object as search.Search_stats, and get_legal_move_outcomes
+# and negamax then report to it. When it is None, the search only pays for one test per node.
+# Every move computed while statistics are on gives a record (a dict) that can be written to a file as a JSON line.
+import json
+import time
+from . import search
+
+# Board methods that are timed while a move is computed: the win checks (is_winner and wins_at, its check of the lines through
+# the last move that negamax uses) and the move generator
+TIMED_METHODS = {'is_winner': 'win_check', 'wins_at': 'win_check', 'gen_legal_moves': 'legal_moves'}
+
+# Statistics of the moves computed while it is installed as search.Search_stats
+class SearchStats:
+	def __init__(self, log_file=None):
+		self.log_file = log_file
+		self.records = []
+		self.reset_move()
+
+	# Start the counters of a move. Node, transposition table and cutoff counters are per move, the records keep them.
+	def reset_move(self):
+		self.cutoffs = 0
+		self.moves = 0
+		self.visits = 0
+		self.min_empty = None
+		self.times = {'win_check': 0.0, 'legal_moves': 0.0}
+		self.calls = {'win_check': 0, 'legal_moves': 0}
+
+	# Called by negamax for every node with the number of empty points (legal moves) of the node
+	def visit(self, empty_points):
+		self.visits += 1
+		self.moves += empty_points
+		if self.min_empty is None or empty_points < self.min_empty: self.min_empty = empty_points
+
+	# Called by negamax for every beta cutoff
+	def cutoff(self):
+		self.cutoffs += 1
+
+	# Compute a move with function(*args), where args starts with (board, player), and record the statistics of the search.
+	# The board methods in TIMED_METHODS are timed by wrapping them on the board object for the length of the call.
+	def measure(self, function, args):
+		board, player = args[0], args[1]
+		table = search.Transposition_table
+		self.reset_move()
+		root_empty = board.empty_count
+		start_counters = (search.get_search_nodes(), table.hits, table.misses, table.stores)
+		for name, category in TIMED_METHODS.items(): setattr(board, name, self.timed(getattr(board, name), category))
+		start = time.perf_counter()
+		try:
+			pts, vals = function(*args)
+		finally:
+			elapsed = time.perf_counter() - start
+			for name in TIMED_METHODS: delattr(board, name)
+		nodes, hits, misses, stores = (now - before for now, before in zip((search.get_search_nodes(), table.hits, table.misses, table.stores), start_counters))
+		record = {
+			'position': format(board.key, '016x'),
+			'player': player,
+			'legal_moves': root_empty,
+			'best_value': json_value(max(vals)) if len(vals) else None,
+			'nodes': nodes,
+			'tt_probes': hits + misses,
+			'tt_hits': hits,
+			'tt_stores': stores,
+			'cutoffs': self.cutoffs,
+			'max_depth': 0 if self.min_empty is None else root_empty - self.min_empty,
+			'branching': round(self.moves / self.visits, 3) if self.visits else 0,
+			'time_ms': round(1000 * elapsed, 3),
+			'win_check_ms': round(1000 * self.times['win_check'], 3),
+			'win_checks': self.calls['win_check'],
+			'legal_moves_ms': round(1000 * self.times['legal_moves'], 3),
+			'legal_move_calls': self.calls['legal_moves'],
+		}
+		self.records.append(record)
+		if self.log_file is not None:
+			with open(self.log_file, 'a') as log: log.write(json.dumps(record) + '\n')
+		return pts, vals
+
+	# Return method wrapped to add its running time and number of calls to category
+	def timed(self, method, category):
+		times, calls, clock = self.times, self.calls, time.perf_counter
+		def timed_method(*args):
+			start = clock()
+			try:
+				return method(*args)
+			finally:
+				times[category] += clock() - start
+				calls[category] += 1
+		return timed_method
+
+	# Return the totals of all records: the sums of the counters, the maximum depth and the number of moves computed
+	def totals(self):
+		totals = {'moves': len(self.records)}
+		for record in self.records:
+			for name, value in record.items():
+				if name in ('position', 'player', 'legal_moves', 'best_value', 'branching'): continue
+				if name == 'max_depth': totals[name] = max(totals.get(name, 0), value)
+				else: totals[name] = totals.get(name, 0) + value
+		return totals
+
+
+# Return a move value as an int (a game result) or a float (a heuristic value) for JSON
+def json_value(val):
+	return int(val) if val == int(val) else float(val)
+
+
+# Turn statistics on, appending a JSON line per computed move to log_file if given. Return the SearchStats object.
+# The log file is opened (and created) here, so a path that can not be written raises OSError now rather than during a search.
+def enable(log_file=None):
+	if log_file is not None: open(log_file, 'a').close()
+	search.Search_stats = SearchStats(log_file)
+	return search.Search_stats
+
+
+# Turn statistics off. Return the SearchStats object that was installed, or None.
+def disable():
+	stats, search.Search_stats = search.Search_stats, None
+	return stats
@@ -0,0 +1,87 @@
+# Threat-space search: immediate wins, forced blocks, double threats (forks) and forced-win sequences, found from the win lines
+# of the board (board.open_lines) instead of trial-playing every empty point.
+# A threat is a line where a player has k-1 stones and the last point is empty: the opponent has to block it at once.
+# A forced win is a sequence of moves that each make a threat, so every reply of the opponent is forced, ending with a double
+# threat (two winning points, only one can be blocked) or a win. Only threat moves are tried, so the search is small and its
+# wins are proven; it does not look for draws or for the defence against a forced win of the opponent.
+# It is the pre-search filter of gen and t (search.get_legal_move_outcomes with threat_check=True).
+
+# Largest number of threats in a forced-win sequence
+MAX_THREAT_DEPTH = 12
+# Largest number of moves tried by one threat search, so it stays cheap on big boards with many threats
+THREAT_NODE_LIMIT = 20000
+
+
+# Return the points where player wins with one move, in increasing order
+def winning_points(board, player):
+	if board.win_length < 1: return []
+	return sorted(set(pt for line in board.open_lines(player, board.win_length - 1) for pt in line))
+
+
+# Return the points where a move of player makes a threat (a line with k-1 stones of player and an empty point), in increasing order
+def threat_points(board, player):
+	if board.win_length < 2: return []
+	return sorted(set(pt for line in board.open_lines(player, board.win_length - 2) for pt in line))
+
+
+# Return the moves of player that keep a forced win going: an immediate win, else the block of a single threat of the
+# opponent (it has to be played, and must make a threat itself to keep the initiative), else every threat move
+def attack_points(board, player):
+	wins = winning_points(board, player)
+	if wins: return wins
+	blocks = winning_points(board, board.x_player + board.o_player - player)
+	if blocks: return blocks if len(blocks) == 1 else []
+	return threat_points(board, player)
+
+
+# Return True if the move pt of player starts a forced win of at most depth threats. Parameter budget is a one item list with
+# the number of moves the search may still try.
+def forces_win(board, player, pt, depth, budget):
+	if budget[0] <= 0: return False
+	budget[0] -= 1
+	opponent = board.x_player + board.o_player - player
+	board.play_move(player, pt)
+	try:
+		if board.wins_at(pt): return True
+		# The opponent wins first
+		if winning_points(board, opponent): return False
+		threats = winning_points(board, player)
+		# Double threat: only one of the winning points can be blocked
+		if len(threats) >= 2: return True
+		if not threats or depth <= 0 or board.empty_count < 2: return False
+		# The opponent has to block the threat
+		block = threats[0]
+		board.play_move(opponent, block)
+		try:
+			return any(forces_win(board, player, next_pt, depth - 1, budget) for next_pt in attack_points(board, player))
+		finally:
+			board.undo_move(block)
+	finally:
+		board.undo_move(pt)
+
+
+# Return a move of player that starts a forced win, or None if the threat search finds none
+def forced_win(board, player, max_depth=MAX_THREAT_DEPTH):
+	budget = [THREAT_NODE_LIMIT]
+	for pt in attack_points(board, player):
+		if forces_win(board, player, pt, max_depth, budget): return pt
+	return None
+
+
+# Return the minimax values the threat search proves for the moves pts of player as {pt: value}; moves it can not decide are
+# left out. Immediate wins and moves that start a forced win are 1. If the opponent has a winning point every other move
+# is -1, and if it has two every move is -1. With all_wins=False the search stops at the first win it finds.
+def threat_values(board, player, pts, all_wins=False, max_depth=MAX_THREAT_DEPTH):
+	opponent = board.x_player + board.o_player - player
+	wins = set(winning_points(board, player))
+	if wins: return {pt: 1 for pt in pts if pt in wins}
+	blocks = winning_points(board, opponent)
+	if len(blocks) >= 2: return {pt: -1 for pt in pts}
+	values = {pt: -1 for pt in pts if pt not in blocks} if blocks else {}
+	candidates = set(blocks or threat_points(board, player))
+	budget = [THREAT_NODE_LIMIT]
+	for pt in pts:
+		if pt in candidates and forces_win(board, player, pt, max_depth, budget):
+			values[pt] = 1
+			if not all_wins: break
+	return values